@@ -1,7 +1,5 @@
 __version__ = '1.0.0-dev'
 __author__ = 'Abhilash Joseph C'
 
-from py3resttest.utils import register_extensions
-
-register_extensions('py3resttest.ext.validator_jsonschema')
-register_extensions('py3resttest.ext.extractor_jmespath')
+# Nothing is imported here, so the command line starts fast: the extensions shipped with py3resttest
+# are registered by validators.load_builtin_extensions() once a test file needs them
@@ -0,0 +1,262 @@
+import csv
+import json
+import logging
+import os
+import statistics
+from typing import Dict, List, Tuple
+
+import pycurl
+
+from py3resttest.constants import BenchmarkKeywords
+from py3resttest.testcase import TestCase
+from py3resttest.utils import Parser
+
+"""
+Benchmarks: run a test many times and collect libcurl metrics about the transfers
+"""
+
+logger = logging.getLogger('py3resttest')
+
+# Metrics that can be collected, mapped to the curl info to read after each transfer
+METRICS = {
+    # Timing info, precisely in order from start to finish
+    # The time it took from the start until the name resolving was completed.
+    'namelookup_time': pycurl.NAMELOOKUP_TIME,
+
+    # The time it took from the start until the connect to the remote host (or proxy) was completed.
+    'connect_time': pycurl.CONNECT_TIME,
+
+    # The time it took from the start until the SSL connect/handshake with the remote host was completed.
+    'appconnect_time': pycurl.APPCONNECT_TIME,
+
+    # The time it took from the start until the file transfer is just about to begin.
+    'pretransfer_time': pycurl.PRETRANSFER_TIME,
+
+    # The time it took from the start until the first byte is received by libcurl.
+    'starttransfer_time': pycurl.STARTTRANSFER_TIME,
+
+    # The time it took for all redirection steps include name lookup, connect, pretransfer and transfer
+    # before final transaction was started. So, this is zero if no redirection took place.
+    'redirect_time': pycurl.REDIRECT_TIME,
+
+    # Total time of the previous request.
+    'total_time': pycurl.TOTAL_TIME,
+
+    # Transfer sizes and speeds, the floating point infos are deprecated in favour of the integer (_T) ones
+    'size_download': getattr(pycurl, 'SIZE_DOWNLOAD_T', pycurl.SIZE_DOWNLOAD),
+    'size_upload': getattr(pycurl, 'SIZE_UPLOAD_T', pycurl.SIZE_UPLOAD),
+    'request_size': pycurl.REQUEST_SIZE,
+    'speed_download': getattr(pycurl, 'SPEED_DOWNLOAD_T', pycurl.SPEED_DOWNLOAD),
+    'speed_upload': getattr(pycurl, 'SPEED_UPLOAD_T', pycurl.SPEED_UPLOAD),
+
+    # Connection counts
+    'redirect_count': pycurl.REDIRECT_COUNT,
+    'num_connects': pycurl.NUM_CONNECTS
+}
+
+# Aggregate functions, each takes the list of values of a metric and returns a single value
+AGGREGATES = {
+    'mean_arithmetic': statistics.mean,
+    'mean': statistics.mean,
+    'mean_harmonic': statistics.harmonic_mean,
+    'median': statistics.median,
+    'std_deviation': statistics.pstdev,
+    'sum': sum,
+    'total': sum
+}
+
+OUTPUT_FORMATS = ('csv', 'json')
+
+
+class BenchmarkResult:
+    """ Metrics collected over the timed runs of a benchmark, and their aggregates """
+
+    def __init__(self, name=None, group=None):
+        self.name = name
+        self.group = group
+        self.failures = 0
+        self.results = {}  # metric name -> list of values, one per successful run
+        self.aggregates = []  # list of (metric name, aggregate name, value)
+
+    def __str__(self):
+        return json.dumps(self, default=Parser.safe_to_json)
+
+
+class Benchmark(TestCase):
+    """ A test case run warmup_runs times untimed, then benchmark_runs times collecting metrics
+
+        Benchmarks do as little as possible: response bodies are discarded and neither
+        validators nor extractors run. Failed transfers are only counted.
+    """
+
+    def __init__(self, base_url='', extract_binds=None, variable_binds=None, context=None, config=None):
+        super().__init__(base_url, extract_binds, variable_binds, context=context, config=config)
+        self.warmup_runs = 10
+        self.benchmark_runs = 100
+        self.output_format = 'csv'
+        self.output_file = None
+        self.raw_metrics = set()  # metrics reported value by value
+        self.aggregated_metrics = {}  # metric name -> list of aggregate names
+
+    @property
+    def metrics(self):
+        return self.raw_metrics | set(self.aggregated_metrics)
+
+    @metrics.setter
+    def metrics(self, metric_list):
+        """ Metrics are a list of metric names (raw values) and/or {metric: aggregate(s)} mappings """
+        if isinstance(metric_list, (str, dict)):
+            metric_list = [metric_list]
+        if not isinstance(metric_list, list):
+            raise TypeError("Invalid benchmark metrics, must be a list or a mapping, not %s" % type(metric_list))
+        for metric in metric_list:
+            if isinstance(metric, dict):
+                for metric_name, aggregate_list in metric.items():
+                    if not isinstance(aggregate_list, list):
+                        aggregate_list = [aggregate_list]
+                    for aggregate_name in aggregate_list:
+                        self.add_metric(metric_name, aggregate_name)
+            else:
+                self.add_metric(metric)
+
+    def add_metric(self, metric_name, aggregate_name=None):
+        metric_name = str(metric_name).lower()
+        if metric_name not in METRICS:
+            raise ValueError("Invalid benchmark metric %s" % metric_name)
+        if aggregate_name is None:
+            self.raw_metrics.add(metric_name)
+            return
+        aggregate_name = str(aggregate_name).lower()
+        if aggregate_name not in AGGREGATES:
+            raise ValueError("Invalid aggregate function %s" % aggregate_name)
+        aggregate_list = self.aggregated_metrics.setdefault(metric_name, [])
+        if aggregate_name not in aggregate_list:
+            aggregate_list.append(aggregate_name)
+
+    def parse(self, benchmark_dict):
+        super().parse(benchmark_dict)
+        benchmark_dict = Parser.flatten_lowercase_keys_dict(benchmark_dict)
+
+        for key, value in benchmark_dict.items():
+            if key == BenchmarkKeywords.warmup_runs:
+                self.warmup_runs = int(value)
+            elif key == BenchmarkKeywords.benchmark_runs:
+                self.benchmark_runs = int(value)
+            elif key == BenchmarkKeywords.metrics:
+                self.metrics = value
+            elif key == BenchmarkKeywords.output_format:
+                output_format = str(value).lower()
+                if output_format not in OUTPUT_FORMATS:
+                    raise ValueError("Invalid benchmark output format %s, use one of %s" % (value, OUTPUT_FORMATS))
+                self.output_format = output_format
+            elif key == BenchmarkKeywords.output_file:
+                self.output_file = value
+
+    def run(self, context=None, timeout=None, curl_handler=None) -> BenchmarkResult:
+        """ Run the benchmark and return its BenchmarkResult
+            The same curl handle is used for every run, so the connection is kept alive between them """
+
+        supplied_handler = curl_handler
+        metric_list = sorted(self.metrics)
+        result = BenchmarkResult(name=self.name, group=self.group)
+        result.results = {metric_name: [] for metric_name in metric_list}
+
+        logger.info("Warmup: %s, benchmark: %s" % (self.warmup_runs, self.name))
+        for _ in range(self.warmup_runs):
+            curl_handler, _ = self.__perform(context, timeout, curl_handler)
+
+        logger.info("Benchmarking: %s" % self.name)
+        for _ in range(self.benchmark_runs):
+            curl_handler, success = self.__perform(context, timeout, curl_handler)
+            if not success:
+                result.failures += 1
+                continue
+            for metric_name in metric_list:
+                result.results[metric_name].append(curl_handler.getinfo(METRICS[metric_name]))
+
+        if curl_handler is not None and curl_handler is not supplied_handler:
+            curl_handler.close()
+        self.aggregate(result)
+        return result
+
+    def __perform(self, context, timeout, curl_handler) -> Tuple[pycurl.Curl, bool]:
+        """ Do one transfer, returning the curl handle used and whether it succeeded with an expected status """
+        curl_handler = self.prepare(context=context, timeout=timeout, curl_handler=curl_handler)
+        curl_handler.setopt(pycurl.WRITEFUNCTION, lambda data: None)  # Bodies are not kept
+        curl_handler.setopt(pycurl.HEADERFUNCTION, lambda data: None)
+        try:
+            curl_handler.perform()
+        except pycurl.error:
+            logger.warning("Benchmark transfer failed: %s" % self.name, exc_info=True)
+            return curl_handler, False
+        finally:
+            self.release_request_body()
+        status_code = curl_handler.getinfo(pycurl.RESPONSE_CODE)
+        if status_code not in self.expected_http_status_code_list:
+            logger.warning("Benchmark %s: response code %s not in expected codes %s" % (
+                self.name, status_code, self.expected_http_status_code_list))
+            return curl_handler, False
+        return curl_handler, True
+
+    def aggregate(self, result: BenchmarkResult):
+        """ Compute the requested aggregates and drop the values of metrics only needed for them """
+        result.aggregates = []
+        for metric_name, aggregate_list in sorted(self.aggregated_metrics.items()):
+            values = result.results.get(metric_name)
+            for aggregate_name in aggregate_list:
+                value = AGGREGATES[aggregate_name](values) if values else None
+                result.aggregates.append((metric_name, aggregate_name, value))
+        for metric_name in list(result.results):
+            if metric_name not in self.raw_metrics:
+                del result.results[metric_name]
+        return result
+
+
+def metrics_to_tuples(raw_metrics: Dict[str, List]) -> List:
+    """ Turn {metric: [values]} into rows, the first row holding the metric names """
+    metric_names = sorted(raw_metrics)
+    rows = [tuple(metric_names)]
+    rows.extend(zip(*[raw_metrics[metric_name] for metric_name in metric_names]))
+    return rows
+
+
+def write_benchmark_json(file_out, benchmark_result: BenchmarkResult):
+    json.dump({
+        'name': benchmark_result.name,
+        'group': benchmark_result.group,
+        'failures': benchmark_result.failures,
+        'results': benchmark_result.results,
+        'aggregates': benchmark_result.aggregates
+    }, file_out)
+
+
+def write_benchmark_csv(file_out, benchmark_result: BenchmarkResult):
+    writer = csv.writer(file_out)
+    writer.writerow(('Benchmark', benchmark_result.name))
+    writer.writerow(('Benchmark Group', benchmark_result.group))
+    writer.writerow(('Failures', benchmark_result.failures))
+
+    if benchmark_result.aggregates:
+        writer.writerow(('Aggregates',))
+        writer.writerows(benchmark_result.aggregates)
+
+    if benchmark_result.results:
+        writer.writerow(('Raw Metrics',))
+        writer.writerows(metrics_to_tuples(benchmark_result.results))
+
+
+OUTPUT_WRITERS = {
+    'csv': write_benchmark_csv,
+    'json': write_benchmark_json
+}
+
+
+def write_benchmark_result(benchmark: Benchmark, benchmark_result: BenchmarkResult, directory=None):
+    """ Write the result to the benchmark's output_file, in its output_format
+        A relative output_file is taken from directory if given, else from the working directory """
+    if not benchmark.output_file:
+        return
+    output_file = os.path.join(directory, benchmark.output_file) if directory else benchmark.output_file
+    logger.info("Writing benchmark %s output to %s" % (benchmark.name, output_file))
+    with open(output_file, 'w', newline='') as file_out:
+        OUTPUT_WRITERS[benchmark.output_format](file_out, benchmark_result)
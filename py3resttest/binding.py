@@ -15,6 +15,7 @@ class Context(object):
         self.variables = {}  # Maps variable name to current value
         self.generators = {}  # Maps generator name to generator function
         self.mod_count = 0  # Lets us see if something has been altered, avoiding needless retemplating
+        self.variable_versions = {}  # Maps variable name to the mod_count of its last change
 
     def bind_variable(self, variable_name, variable_value):
         """ Bind a named variable to a value within the context
@@ -25,6 +26,7 @@ class Context(object):
         if prev != variable_value:
             self.variables[str(variable_name)] = variable_value
             self.mod_count = self.mod_count + 1
+            self.variable_versions[str_name] = self.mod_count
             logger.info('Context: altered variable named {0} to value {1}'.format(str_name, variable_value))
 
     def bind_variables(self, variable_map):
@@ -52,6 +54,7 @@ class Context(object):
         if prev != val:
             self.variables[str_name] = val
             self.mod_count = self.mod_count + 1
+            self.variable_versions[str_name] = self.mod_count
             logging.debug(
                 'Context: Set variable named {0} to next value {1} from generator named {2}'.format(variable_name, val,
                                                                                                     generator_name))
@@ -60,6 +63,10 @@ class Context(object):
     def get_values(self):
         return self.variables
 
+    def get_versions(self, variable_names):
+        """ Versions of the named variables, the tuple changes whenever one of them is rebound to a new value """
+        return tuple(self.variable_versions.get(name) for name in variable_names)
+
     def get_value(self, variable_name):
         """ Get bound variable value, or return none if not set """
         return self.variables.get(str(variable_name))
@@ -1,6 +1,7 @@
 import operator
 import re
 from enum import Enum
+from functools import lru_cache
 
 import pycurl
 
@@ -17,8 +18,21 @@ def safe_length(var):
     return output
 
 
-def regex_compare(input_val, regex):
-    return bool(re.search(regex, input_val))
+@lru_cache(maxsize=512)
+def compile_regex(pattern):
+    """ Compiled regular expression, shared by everyone using the same pattern """
+    return re.compile(pattern)
+
+
+def regex_compare(input_val, regex, max_length=None):
+    """ Search input_val for regex, a pattern string or a compiled pattern
+        Inputs longer than max_length raise ValueError: a backtracking pattern could stall on them """
+    if max_length is not None and len(input_val) > max_length:
+        raise ValueError("Input of {0} characters is longer than the regex limit of {1}".format(
+            len(input_val), max_length))
+    if isinstance(regex, str):
+        regex = compile_regex(regex)
+    return bool(regex.search(input_val))
 
 
 def test_type(val, _type):
@@ -64,6 +78,15 @@ class TestCaseKeywords:
     options = 'options'
     global_env = 'global_env'
     absolute_urls = 'absolute-url'
+    tags = 'tags'
+
+
+class BenchmarkKeywords:
+    warmup_runs = 'warmup_runs'
+    benchmark_runs = 'benchmark_runs'
+    metrics = 'metrics'
+    output_format = 'output_format'
+    output_file = 'output_file'
 
 
 class EnumHttpMethod(Enum):
@@ -72,7 +95,7 @@ class EnumHttpMethod(Enum):
     PATCH = pycurl.POSTFIELDS
     POST = pycurl.POST
     DELETE = pycurl.CUSTOMREQUEST
-    HEAD = pycurl.CUSTOMREQUEST
+    HEAD = pycurl.NOBODY  # A value of its own, an Enum member sharing DELETE's would just be an alias of it
 
 
 class AuthType:
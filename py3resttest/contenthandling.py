@@ -1,13 +1,103 @@
+import mmap
 import os
-import string
+import threading
+from collections import OrderedDict
 
-from py3resttest.utils import Parser
+from py3resttest.templating import compile_template
+from py3resttest.utils import Parser, resolve_path
 
 """
 Encapsulates contend handling logic, for pulling file content into tests
 """
 
 
+class FileContentCache:
+    """ Size bounded LRU cache of file contents, keyed by absolute path and modification time
+
+        A file is read again only once it changes on disk, files bigger than max_bytes are never cached.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()  # absolute path -> (mtime, size, content)
+        self.__lock = threading.Lock()
+
+    def read(self, path) -> str:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.__lock:
+            entry = self.__entries.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self.__entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+        with open(path, 'r') as f:
+            content = f.read()
+        with self.__lock:
+            self.misses += 1
+            self.__discard(path)
+            if len(content) <= self.max_bytes:
+                self.__entries[path] = (stat.st_mtime_ns, stat.st_size, content)
+                self.size += len(content)
+                while self.size > self.max_bytes:
+                    self.__discard(next(iter(self.__entries)))
+        return content
+
+    def __discard(self, path):
+        entry = self.__entries.pop(path, None)
+        if entry:
+            self.size -= len(entry[2])
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.size = 0
+
+
+CONTENT_CACHE = FileContentCache()
+
+
+class FileStream:
+    """ Read only memory map of a file, fed to curl's READFUNCTION piece by piece
+
+        Pages are loaded from disk as curl asks for them, so sending a big file doesn't grow the memory used.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.__file = open(path, 'rb')
+        self.size = os.fstat(self.__file.fileno()).st_size
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.__position = 0
+
+    def read(self, size) -> bytes:
+        if self.__map is None:
+            return b''
+        chunk = self.__map[self.__position:self.__position + size]
+        self.__position += len(chunk)
+        return chunk
+
+    def seek(self, offset, origin):
+        """ curl SEEKFUNCTION, lets curl rewind the upload (e.g. to resend it after a redirect) """
+        if origin == os.SEEK_CUR:
+            offset += self.__position
+        elif origin == os.SEEK_END:
+            offset += self.size
+        if not 0 <= offset <= self.size:
+            return 1  # CURL_SEEKFUNC_FAIL
+        self.__position = offset
+        return 0  # CURL_SEEKFUNC_OK
+
+    def close(self):
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+
+
 class ContentHandler:
     """ Handles content that may be (lazily) read from filesystem and/or templated to various degrees
     Also creates pixie dust and unicorn farts on demand
@@ -22,6 +112,8 @@ class ContentHandler:
         - Templated path to file content (path itself is templated), file content TEMPLATED
     """
 
+    STREAM_THRESHOLD = 1024 * 1024  # Untemplated files of this size and more are streamed rather than read
+
     content = None  # Inline content
     is_file = False
     is_template_path = False
@@ -31,24 +123,48 @@ class ContentHandler:
         """ Is templating used? """
         return self.is_template_path or self.is_template_content
 
+    def is_streamable(self):
+        """ Can the content be sent straight from its file, without being read into memory? """
+        return self.is_file and not self.is_template_content
+
+    def get_path(self, context=None):
+        """ Path of the file, templated out """
+        if self.is_template_path and context:
+            return compile_template(self.content).render(context)
+        return self.content
+
+    def open_stream(self, context=None) -> FileStream:
+        """ Memory map the file of streamable content, the caller must close() it """
+        if not self.is_streamable():
+            raise ValueError("Only untemplated file content can be streamed")
+        return FileStream(self.get_path(context))
+
+    def template_variables(self):
+        """ Names of the context variables templating reads, None if a templated path hides them """
+        if self.is_template_path:
+            return None if self.is_template_content else Parser.template_variables(self.content)
+        if not self.is_template_content:
+            return set()
+        if self.is_file:
+            try:
+                return Parser.template_variables(CONTENT_CACHE.read(self.content))
+            except OSError:
+                return None
+        return Parser.template_variables(self.content)
+
     def get_content(self, context=None):
         """ Does all context binding and pathing to get content, templated out """
 
         if self.is_file:
-            path = self.content
-            if self.is_template_path and context:
-                path = string.Template(path).safe_substitute(
-                    context.get_values())
-            with open(path, 'r') as f:
-                data = f.read()
+            data = CONTENT_CACHE.read(self.get_path(context))
 
             if self.is_template_content and context:
-                return string.Template(data).safe_substitute(context.get_values())
+                return compile_template(data).render(context)
             else:
                 return data
         else:
             if self.is_template_content and context:
-                return Parser.safe_substitute_unicode_template(self.content, context.get_values())
+                return compile_template(self.content).render(context)
             else:
                 return self.content
 
@@ -58,8 +174,7 @@ class ContentHandler:
             return self
         output = ContentHandler()
         output.is_template_content = self.is_template_content
-        with open(self.content, 'r') as f:
-            output.content = f.read()
+        output.content = CONTENT_CACHE.read(self.content)
         return output
 
     def setup(self, file_path, is_file=False, is_template_path=False, is_template_content=False):
@@ -67,7 +182,7 @@ class ContentHandler:
         if not isinstance(file_path, str):
             raise TypeError("Input is not a string")
         if is_file:
-            file_path = os.path.abspath(file_path)
+            file_path = resolve_path(file_path)
         self.content = file_path
         self.is_file = is_file
         self.is_template_path = is_template_path
@@ -113,7 +228,7 @@ class ContentHandler:
                 if key == 'template':
                     if isinstance(value, str):
                         if is_file:
-                            value = os.path.abspath(value)
+                            value = resolve_path(value)
                         output.content = value
                         is_template_content = is_template_content or not is_file
                         output.is_template_content = is_template_content
@@ -128,7 +243,7 @@ class ContentHandler:
 
                 elif key == 'file':
                     if isinstance(value, str):
-                        output.content = os.path.abspath(value)
+                        output.content = resolve_path(value)
                         output.is_file = True
                         output.is_template_content = is_template_content
                         return output
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from io import StringIO
+
+from py3resttest.plancache import PLAN_CACHE
+from py3resttest.reporters import TestOutcome
+from py3resttest.runner import ArgsRunner, Runner
+from py3resttest.stats import ConnectionStats
+
+"""
+Warm serving process: runs handed over a Unix socket skip the interpreter start, the imports,
+the parsing of unchanged test files and the handshakes of connections still open from earlier runs
+"""
+
+logger = logging.getLogger('py3resttest')
+
+# Arguments the client passes on to the serving process, the reporting ones stay with the client
+RUN_OPTIONS = ('url', 'test', 'concurrency', 'in_order', 'workers', 'extensions', 'name', 'group', 'tag')
+
+
+def send(stream, event, **fields):
+    """ Write one event as a JSON line """
+    fields['event'] = event
+    stream.write(json.dumps(fields).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+def receive(stream):
+    """ The events of a stream, until it is closed """
+    for line in stream:
+        yield json.loads(line.decode('utf-8'))
+
+
+def is_serving(socket_path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+class PoolStore:
+    """ Idle CurlPools kept between runs, every run takes one of its own so concurrent runs never share one """
+
+    def __init__(self):
+        self.__idle = []
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        from py3resttest.pool import CurlPool  # Loads pycurl, which only the serving side needs
+
+        with self.__lock:
+            pool = self.__idle.pop() if self.__idle else CurlPool()
+        pool.stats = ConnectionStats()  # Count the connections of this run only
+        return pool
+
+    def release(self, pool):
+        with self.__lock:
+            self.__idle.append(pool)
+
+    def close(self):
+        with self.__lock:
+            while self.__idle:
+                self.__idle.pop().close()
+
+
+class RunHandler(socketserver.StreamRequestHandler):
+    """ Runs the test file of one request, streaming a `start`, a `result` per test case and a `finish` event back
+
+        Any failure ends the stream with an `error` event instead.
+    """
+
+    def handle(self):
+        try:
+            request = next(receive(self.rfile))
+            options = request['options']
+        except (StopIteration, ValueError, KeyError):
+            send(self.wfile, 'error', message="Invalid run request")
+            return
+
+        args = ArgsRunner()
+        for option in RUN_OPTIONS:
+            if option in options:
+                setattr(args, option, options[option])
+        pool = self.server.pools.acquire()
+        runner = Runner(args, pool=pool)
+        try:
+            cwd = request.get('cwd', os.getcwd())  # Of the client, which local paths are relative to
+            runner.load_extensions(cwd)
+            testcase_set, selector = runner.build_test_set()
+            send(self.wfile, 'start', total=sum(
+                len(group_object.testcase_list) for group_object in testcase_set.test_group_list_dict.values()))
+
+            def on_complete(group_name, testcase_object):
+                if isinstance(testcase_object, TestOutcome):  # Already summarized by a worker
+                    outcome = testcase_object
+                else:
+                    outcome = TestOutcome.from_testcase(testcase_object)
+                    testcase_object.release_response()
+                send(self.wfile, 'result', group=group_name, outcome=outcome.to_dict())
+
+            runner.run_tests(testcase_set, selector, on_complete)
+            output = StringIO()
+            runner.run_benchmarks(testcase_set.test_group_list_dict, stream=output, directory=cwd)
+            send(self.wfile, 'finish', output=output.getvalue(), connections=pool.stats.to_dict())
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("The client of the run of %s went away", options.get('test'))
+        except Exception as e:
+            logger.debug("Run of %s failed", options.get('test'), exc_info=True)
+            try:
+                send(self.wfile, 'error', message="%s: %s" % (e.__class__.__name__, e))
+            except OSError:
+                pass
+        finally:
+            self.server.pools.release(pool)
+
+
+class RunServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Accepts runs on a Unix socket, each on a thread of its own """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        self.pools = PoolStore()
+        super().__init__(socket_path, RunHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.pools.close()
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt()
+
+
+def serve(socket_path) -> int:
+    """ Serve runs on the socket until interrupted or terminated """
+    if os.path.exists(socket_path):
+        if is_serving(socket_path):
+            print("A process is already serving on %s" % socket_path, file=sys.stderr)
+            return 1
+        os.unlink(socket_path)  # Left behind by a process that died
+
+    PLAN_CACHE.keep_in_memory()
+    umask = os.umask(0o177)  # Only this user may hand runs over, they can load extensions
+    try:
+        server = RunServer(socket_path)
+    finally:
+        os.umask(umask)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _stop)
+
+    print("Serving runs on %s" % socket_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+    return 0
+
+
+class RunClient:
+    """ Hands a run over to a serving process, reporting the streamed results like a local run would """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+
+    def run(self, args: ArgsRunner, runner: Runner) -> int:
+        options = {option: getattr(args, option) for option in RUN_OPTIONS}
+        options['test'] = os.path.abspath(args.test)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            try:
+                connection.connect(self.socket_path)
+            except OSError as e:
+                print("No process is serving on %s: %s" % (self.socket_path, e), file=sys.stderr)
+                return 1
+            with connection.makefile('rwb') as stream:
+                send(stream, 'run', options=options, cwd=os.getcwd())
+                return self.__report(receive(stream), runner)
+
+    @staticmethod
+    def __report(events, runner: Runner) -> int:
+        event = next(events, {'event': 'error', 'message': "The serving process went away"})
+        if event['event'] != 'start':
+            print(event.get('message'), file=sys.stderr)
+            return 1
+
+        last_event = {'event': 'error', 'message': "The serving process went away"}
+
+        def execute(on_complete):
+            for result_event in events:
+                if result_event['event'] != 'result':
+                    last_event.clear()
+                    last_event.update(result_event)
+                    return
+                on_complete(result_event['group'], TestOutcome.from_dict(result_event['outcome']))
+
+        runner.report(event['total'], execute)
+        if last_event['event'] != 'finish':
+            print(last_event.get('message'), file=sys.stderr)
+            return 1
+        sys.stdout.write(last_event['output'])
+        print("========== CONNECTIONS ===========")
+        print(ConnectionStats.from_dict(last_event['connections']))
+        return 0
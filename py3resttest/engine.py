@@ -0,0 +1,144 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import pycurl
+
+from py3resttest.pool import CurlPool
+from py3resttest.scheduler import DependencyGraph
+
+"""
+Concurrent execution of test cases, driving many curl transfers at once through a pycurl.CurlMulti
+"""
+
+logger = logging.getLogger('py3resttest')
+
+
+class CurlMultiEngine:
+    """ Keeps up to `concurrency` requests in flight over a single CurlMulti
+
+        Tests inside a group share a Context, so later tests may depend on values extracted by
+        earlier ones: a DependencyGraph of each group decides which of its tests may be in flight together,
+        a test only starts once the earlier tests sharing its variables are done.
+        With ordered=True a group never has more than one test in flight and its tests run in order.
+        Different groups are independent and are interleaved freely.
+        A test waiting out its delay holds its slot, so with a concurrency of 1 this runs every test
+        one after another, exactly like a plain loop.
+        Curl handles and the CurlMulti come from a CurlPool, pass the runner's pool in to share connections
+        across runs. A pool drives one engine at a time.
+    """
+
+    SELECT_TIMEOUT = 1.0
+
+    def __init__(self, concurrency=1, timeout=None, pool: Optional[CurlPool] = None, ordered=False):
+        if int(concurrency) < 1:
+            raise ValueError("Concurrency must be a positive number, not %s" % concurrency)
+        self.concurrency = int(concurrency)
+        self.timeout = timeout
+        self.pool = pool
+        self.ordered = ordered
+        self.__multi = None
+        self.__graphs = OrderedDict()  # group name -> DependencyGraph of its unfinished test cases
+        self.__in_flight = {}  # curl handle -> (group name, index)
+        self.__delayed = {}  # (group name, index) -> start time, each one holding a slot
+
+    def run(self, test_group_list_dict: Dict, callback: Optional[Callable] = None):
+        """ Run every test case of every group, calling callback(group_name, testcase) as each one finishes """
+        self.__graphs = OrderedDict(
+            (group_name, DependencyGraph(group_object.testcase_list, ordered=self.ordered))
+            for group_name, group_object in test_group_list_dict.items() if group_object.testcase_list
+        )
+        owns_pool = self.pool is None
+        if owns_pool:
+            self.pool = CurlPool()
+        self.__multi = self.pool.multi()
+        try:
+            while self.__graphs:
+                self.__fill()
+                if not self.__in_flight:
+                    if self.__delayed:
+                        time.sleep(self.__select_timeout())
+                    continue
+                self.__perform()
+                for group_name, testcase in self.__collect():
+                    if callback:
+                        callback(group_name, testcase)
+                if self.__in_flight:
+                    self.__multi.select(self.__select_timeout())
+        finally:
+            for curl_handler in list(self.__in_flight):
+                self.__release(curl_handler)
+            self.__multi = None
+            if owns_pool:
+                self.pool.close()
+                self.pool = None
+
+    def __fill(self):
+        """ Start the ready tests of each group until the concurrency limit is reached """
+        now = time.monotonic()
+        for (group_name, index), start_at in list(self.__delayed.items()):
+            if start_at <= now:
+                del self.__delayed[(group_name, index)]
+                self.__start(group_name, index)
+
+        for group_name, graph in self.__graphs.items():
+            for index in graph.ready():
+                if len(self.__in_flight) + len(self.__delayed) >= self.concurrency:
+                    return
+                graph.start(index)
+                testcase = graph.testcase_list[index]
+                if testcase.delay:
+                    # Honour the delay without blocking the other transfers
+                    self.__delayed[(group_name, index)] = now + testcase.delay
+                else:
+                    self.__start(group_name, index)
+
+    def __start(self, group_name, index):
+        testcase = self.__graphs[group_name].testcase_list[index]
+        curl_handler = testcase.prepare(timeout=self.timeout, pool=self.pool)  # Pooled by the final URL
+        logger.info("Hitting %s" % testcase.url)
+        self.__in_flight[curl_handler] = (group_name, index)
+        self.__multi.add_handle(curl_handler)
+
+    def __perform(self):
+        while True:
+            ret, _ = self.__multi.perform()
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+
+    def __collect(self):
+        """ Finalize every transfer curl reports as complete, yield (group name, test case) for each """
+        while True:
+            queued, ok_list, err_list = self.__multi.info_read()
+            for curl_handler in ok_list:
+                yield self.__finish(curl_handler)
+            for curl_handler, errno, message in err_list:
+                logger.error("Curl error %s: %s", errno, message)
+                yield self.__finish(curl_handler, error=(errno, message))
+            if not queued:
+                break
+
+    def __finish(self, curl_handler, error=None):
+        group_name, index = self.__in_flight[curl_handler]
+        graph = self.__graphs[group_name]
+        testcase = graph.testcase_list[index]
+        try:
+            testcase.finalize(curl_handler, error=error)
+        finally:
+            self.__release(curl_handler)
+            graph.finish(index)
+            if graph.is_finished:
+                del self.__graphs[group_name]
+        return group_name, testcase
+
+    def __release(self, curl_handler):
+        del self.__in_flight[curl_handler]
+        self.__multi.remove_handle(curl_handler)
+        self.pool.release(curl_handler)
+
+    def __select_timeout(self):
+        if not self.__delayed:
+            return self.SELECT_TIMEOUT
+        wait = min(self.__delayed.values()) - time.monotonic()
+        return max(0.0, min(wait, self.SELECT_TIMEOUT))
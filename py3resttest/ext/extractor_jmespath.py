@@ -1,10 +1,17 @@
-import json
-
-import jmespath
+from functools import lru_cache
 
+from py3resttest.response import parse_json_body
 from py3resttest.validators import AbstractExtractor
 
 
+@lru_cache(maxsize=1024)
+def compile_expression(query):
+    """ Compiled JMESPath expression, templated queries are cached by their rendered text """
+    import jmespath  # Only loaded once a test uses a JMESPath query
+
+    return jmespath.compile(query)
+
+
 class JMESPathExtractor(AbstractExtractor):
     """ Extractor that uses JMESPath syntax
         See http://jmespath.org/specification.html for details
@@ -12,20 +19,30 @@ class JMESPathExtractor(AbstractExtractor):
     extractor_type = 'jmespath'
     is_body_extractor = True
 
-    def extract_internal(self, query=None, args=None, body=None, headers=None):
-        if isinstance(body, bytes):
-            body = body.decode('utf-8')
+    def __init__(self):
+        super().__init__()
+        self.compiled_expression = None  # Untemplated queries are compiled at parse time
 
+    def extract_internal(self, query=None, args=None, body=None, headers=None):
         try:
-            res = jmespath.search(query, json.loads(body))
+            if self.compiled_expression is not None and query == self.query:
+                expression = self.compiled_expression
+            else:
+                expression = compile_expression(query)
+            res = expression.search(parse_json_body(body))
             return res
         except Exception as e:
             raise ValueError("Invalid query: " + query + " : " + str(e))
 
     @classmethod
     def parse(cls, config):
-        base = JMESPathExtractor()
-        return cls.configure_base(config, base)
+        base = cls.configure_base(config, JMESPathExtractor())
+        if not base.is_templated:
+            try:
+                base.compiled_expression = compile_expression(base.query)
+            except Exception:
+                pass  # Reported by extract_internal, like any other invalid query
+        return base
 
 
 EXTRACTORS = {'jmespath': JMESPathExtractor.parse}
@@ -1,15 +1,34 @@
 import json
+import os
 import traceback
-
-import jsonschema
-import yaml
+from functools import lru_cache
 
 from py3resttest.constants import FAILURE_VALIDATOR_EXCEPTION
 from py3resttest.contenthandling import ContentHandler
+from py3resttest.response import parse_json_body
 from py3resttest.utils import Parser
 from py3resttest.validators import AbstractValidator, Failure
 
 
+@lru_cache(maxsize=128)
+def compile_schema(schema_text):
+    """ Parse and check a schema once, returning a jsonschema validator instance for it """
+    import jsonschema  # Slow to import, only loaded once a test validates a schema
+    import yaml
+
+    schema = yaml.safe_load(schema_text)
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+@lru_cache(maxsize=128)
+def compile_schema_file(path, mtime):
+    """ Compiled schema of a file, the mtime in the key makes an edited file load again """
+    with open(path, 'r') as f:
+        return compile_schema(f.read())
+
+
 class JsonSchemaValidator(AbstractValidator):
     """ Json schema validator using the jsonschema library """
 
@@ -17,13 +36,21 @@ class JsonSchemaValidator(AbstractValidator):
         super(JsonSchemaValidator, self).__init__()
         self.schema_context = None
 
+    def compiled_schema(self, context=None):
+        """ A static schema file is only read again once its mtime changes, other schemas are
+            compiled once per rendered content """
+        schema_context = self.schema_context
+        if schema_context.is_file and not schema_context.is_dynamic():
+            path = schema_context.content
+            return compile_schema_file(path, os.stat(path).st_mtime_ns)
+        return compile_schema(schema_context.get_content(context=context))
+
     def validate(self, body=None, headers=None, context=None):
-        schema_text = self.schema_context.get_content(context=context)
-        schema = yaml.safe_load(schema_text)
+        import jsonschema  # Already loaded by compiled_schema
+
+        schema_validator = self.compiled_schema(context=context)
         try:
-            if isinstance(body, bytes):
-                body = body.decode()
-            jsonschema.validate(json.loads(body), schema)
+            schema_validator.validate(parse_json_body(body))
             return True
         except jsonschema.exceptions.ValidationError:
             return self.__failed("JSON Schema Validation Failed")
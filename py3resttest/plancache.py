@@ -0,0 +1,172 @@
+import hashlib
+import importlib.util
+import logging
+import marshal
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+"""
+On-disk cache of parsed test files, so an unchanged suite is loaded without parsing any YAML
+"""
+
+logger = logging.getLogger('py3resttest')
+
+CACHE_DIR_VARIABLE = 'PY3RESTTEST_CACHE_DIR'  # Set it empty to disable the cache
+CACHE_FORMAT = 3  # Bump when what is cached changes
+
+
+def default_cache_directory():
+    directory = os.environ.get(CACHE_DIR_VARIABLE)
+    if directory is not None:
+        return directory or None
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'py3resttest', 'plans')
+
+
+@lru_cache(maxsize=None)
+def yaml_loader():
+    """ The libyaml based loader is many times faster, fall back to the pure Python one without it """
+    import yaml
+
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=None)
+def yaml_fingerprint() -> bytes:
+    """ Identifies the installed yaml package without importing it, so a cached suite is loaded without yaml
+        Reinstalling or upgrading it changes the modification time of its files """
+    spec = importlib.util.find_spec('yaml')
+    if spec is None or not spec.origin:
+        return b'no-yaml'
+    directory = os.path.dirname(spec.origin)
+    stamps = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.py', '.so', '.pyd')):
+            stamps.append('%s:%d' % (name, os.stat(os.path.join(directory, name)).st_mtime_ns))
+    return ('%s|%s' % (directory, ','.join(stamps))).encode()
+
+
+def parse_yaml(text):
+    import yaml  # Imported when a test file is first read, not when the command line starts
+
+    return yaml.load(text, Loader=yaml_loader())
+
+
+class PlanCache:
+    """ Parsed test files, stored on disk under the hash of their content
+
+        Every file is cached on its own, an include or import is looked up when it is walked,
+        so changing one file of a suite only parses that file again.
+        Entries are marshal dumps of plain data, loading one never runs code. They are written under
+        a directory only this user may open, like any cache they can be deleted at any time.
+        A file holding what marshal cannot store, such as a YAML timestamp, is parsed every time.
+        A long running process can keep_in_memory() the most recent entries as well, it still reads
+        the test files (so edits are seen) but never the cache directory.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.memory = None  # key -> marshalled plan, most recently used last
+        self.memory_entries = 0
+        self.__lock = threading.Lock()  # Guards the memory entries and the counters, runs of a daemon share them
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def keep_in_memory(self, entries=256):
+        """ Also keep the last `entries` parsed files in memory """
+        with self.__lock:
+            self.memory = OrderedDict()
+            self.memory_entries = entries
+
+    def __count(self, hit):
+        with self.__lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def __memory_get(self, key):
+        with self.__lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+            return entry
+
+    def __memory_put(self, key, entry):
+        with self.__lock:
+            self.memory[key] = entry
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    @staticmethod
+    def key(content: bytes) -> str:
+        digest = hashlib.blake2b(content, digest_size=20)
+        digest.update(b'%d:%s' % (CACHE_FORMAT, yaml_fingerprint()))
+        return digest.hexdigest()
+
+    def __entry_path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.marshal')
+
+    def load(self, path):
+        """ The parsed content of a test file, from the cache if it has seen the same content before """
+        with open(path, 'rb') as f:
+            content = f.read()
+        if not self.enabled and self.memory is None:
+            return parse_yaml(content)
+
+        key = self.key(content)
+        if self.memory is not None:
+            entry = self.__memory_get(key)
+            if entry is not None:
+                self.__count(hit=True)
+                return marshal.loads(entry)  # A copy of its own for every caller
+
+        plan = self.__load_entry(key) if self.enabled else None
+        if plan is None:
+            self.__count(hit=False)
+            plan = parse_yaml(content)
+            try:
+                entry = marshal.dumps(plan)
+            except ValueError:
+                logger.debug("Not caching %s, it holds values marshal cannot store", path)
+                return plan
+            if self.enabled:
+                self.__store(self.__entry_path(key), entry)
+        else:
+            self.__count(hit=True)
+            entry = marshal.dumps(plan) if self.memory is not None else None
+        if entry is not None and self.memory is not None:
+            self.__memory_put(key, entry)
+        return plan
+
+    def __load_entry(self, key):
+        entry_path = self.__entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                return marshal.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception:  # Truncated or incompatible entry, parse again and replace it
+            logger.debug("Discarding plan cache entry %s", entry_path, exc_info=True)
+        return None
+
+    def __store(self, entry_path, entry):
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)  # Only this user may plant entries
+            os.makedirs(os.path.dirname(entry_path), mode=0o700, exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(entry)
+            os.replace(temp_path, entry_path)  # Atomic, concurrent runs never see half an entry
+        except Exception:
+            logger.debug("Unable to write plan cache entry %s", entry_path, exc_info=True)
+
+
+PLAN_CACHE = PlanCache(default_cache_directory())
@@ -0,0 +1,67 @@
+import logging
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+import pycurl
+
+from py3resttest.stats import ConnectionStats  # noqa: F401 (imported from here by callers)
+
+"""
+Pooling of curl handles, so consecutive requests to a host reuse the same (kept alive) connection
+"""
+
+logger = logging.getLogger('py3resttest')
+
+
+class CurlPool:
+    """ Per-host pool of idle curl handles
+
+        A curl handle keeps its connection cache across reset(), so handing the same handle to the next
+        test against a host lets libcurl reuse the open TCP/TLS connection instead of handshaking again.
+    """
+
+    def __init__(self, max_idle_per_host=32):
+        self.max_idle_per_host = max_idle_per_host
+        self.stats = ConnectionStats()
+        self.__idle = defaultdict(deque)  # host key -> idle curl handles
+        self.__multi = None
+
+    @staticmethod
+    def host_key(url):
+        parts = urlsplit(str(url))
+        return parts.scheme.lower(), parts.netloc.lower()
+
+    def acquire(self, url) -> pycurl.Curl:
+        """ Get an idle handle that last talked to the host of url, or a new one """
+        idle = self.__idle.get(self.host_key(url))
+        if idle:
+            return idle.pop()
+        return pycurl.Curl()
+
+    def release(self, curl_handler):
+        """ Give a handle back once its transfer is over, recording whether the connection was reused """
+        try:
+            self.stats.record(curl_handler.getinfo(pycurl.NUM_CONNECTS))
+            url = curl_handler.getinfo(pycurl.EFFECTIVE_URL)
+        except pycurl.error:  # Closed handle, nothing to pool
+            return
+        idle = self.__idle[self.host_key(url)]
+        if len(idle) < self.max_idle_per_host:
+            idle.append(curl_handler)
+        else:
+            curl_handler.close()
+
+    def multi(self) -> pycurl.CurlMulti:
+        """ The CurlMulti to drive the handles with, its connection cache lasts as long as the pool """
+        if self.__multi is None:
+            self.__multi = pycurl.CurlMulti()
+        return self.__multi
+
+    def close(self):
+        for idle in self.__idle.values():
+            while idle:
+                idle.pop().close()
+        self.__idle.clear()
+        if self.__multi is not None:
+            self.__multi.close()
+            self.__multi = None
@@ -0,0 +1,230 @@
+import heapq
+import json
+import sys
+from abc import ABCMeta, abstractmethod
+from typing import Dict
+
+"""
+Reporters receiving each test result as soon as it finishes, so a run never holds on to finished test cases
+"""
+
+
+class TestOutcome:
+    """ Picklable summary of a finished test case, what reporters get and what a worker sends back to the parent """
+
+    def __init__(self, name, is_passed, failures, status_code=None, elapsed=None, timings=None):
+        self.name = name
+        self.is_passed = is_passed
+        self.failures = failures  # failure messages
+        self.status_code = status_code  # None if the transfer failed
+        self.timings = timings  # stats.Timings of the transfer
+        if elapsed is None and timings is not None:
+            elapsed = timings.total_time
+        self.elapsed = elapsed  # seconds, as timed by curl
+
+    @classmethod
+    def from_testcase(cls, testcase):
+        response = testcase.response
+        return cls(testcase.name, testcase.is_passed, [str(failure) for failure in testcase.failures],
+                   status_code=response.status_code if response is not None else None, timings=testcase.timings)
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'passed': self.is_passed, 'failures': self.failures,
+                'status_code': self.status_code, 'elapsed': self.elapsed,
+                'timings': self.timings.to_dict() if self.timings is not None else None}
+
+    @classmethod
+    def from_dict(cls, outcome_dict: Dict) -> 'TestOutcome':
+        """ The outcome to_dict() described, e.g. one streamed by a serving process """
+        from py3resttest.stats import Timings
+
+        timings = outcome_dict.get('timings')
+        return cls(outcome_dict['name'], outcome_dict['passed'], outcome_dict.get('failures', []),
+                   status_code=outcome_dict.get('status_code'), elapsed=outcome_dict.get('elapsed'),
+                   timings=Timings(**timings) if timings is not None else None)
+
+
+class ResultSummary:
+    """ Running pass/fail counters, overall and per group """
+
+    def __init__(self, total=0):
+        self.total = total  # test cases expected to run
+        self.passed = 0
+        self.failed = 0
+        self.groups = {}  # group name -> [passed, failed]
+
+    def record(self, group_name, outcome: TestOutcome):
+        counters = self.groups.setdefault(group_name, [0, 0])
+        if outcome.is_passed:
+            self.passed += 1
+            counters[0] += 1
+        else:
+            self.failed += 1
+            counters[1] += 1
+
+    @property
+    def finished(self):
+        return self.passed + self.failed
+
+
+class Reporter(metaclass=ABCMeta):
+    """ Base reporter, you only need to implement report """
+
+    def start(self, summary: ResultSummary):
+        """ Called once before the first result """
+
+    @abstractmethod
+    def report(self, group_name, outcome: TestOutcome):
+        """ Called as each test case finishes, in completion order """
+
+    def finish(self, summary: ResultSummary):
+        """ Called once after the last result """
+
+    def close(self):
+        """ Release whatever the reporter writes to """
+
+
+class ConsoleReporter(Reporter):
+    """ The coloured end of run report, only the failed and the slowest test cases are remembered until then """
+
+    FAIL = '\033[91m'
+    SUCCESS = '\033[92m'
+    NOCOL = '\033[0m'
+
+    def __init__(self, stream=None, slowest=10):
+        self.stream = stream if stream is not None else sys.stdout
+        self.failure_dict = {}  # group name -> list of failed TestOutcome
+        self.slowest = slowest  # how many of the slowest test cases to list
+        self.__slowest_heap = []  # min-heap of (elapsed, arrival, group name, TestOutcome)
+        self.__arrival = 0
+
+    def report(self, group_name, outcome: TestOutcome):
+        if not outcome.is_passed:
+            self.failure_dict.setdefault(group_name, []).append(outcome)
+        if self.slowest and outcome.elapsed is not None:
+            self.__arrival += 1
+            entry = (outcome.elapsed, -self.__arrival, group_name, outcome)
+            if len(self.__slowest_heap) < self.slowest:
+                heapq.heappush(self.__slowest_heap, entry)
+            elif entry[:2] > self.__slowest_heap[0][:2]:
+                heapq.heapreplace(self.__slowest_heap, entry)
+
+    def slowest_outcomes(self):
+        """ (group name, TestOutcome) of the slowest test cases, slowest first """
+        return [(group_name, outcome) for _, _, group_name, outcome in sorted(
+            self.__slowest_heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def __print(self, text):
+        print(text, file=self.stream)
+
+    def finish(self, summary: ResultSummary):
+        self.__print("========== TEST RESULT ===========")
+        self.__print("Total Test to run: %s" % summary.total)
+        for group_name, outcome_list in self.failure_dict.items():
+            self.__print("%sGroup Name: %s %s" % (self.FAIL, group_name, self.NOCOL))
+            self.__print('%sTotal testcase failed: %s %s' % (self.FAIL, len(outcome_list), self.NOCOL))
+            for index, outcome in enumerate(outcome_list):
+                self.__print('\t%s %s. Case Name: %s %s' % (self.FAIL, index + 1, outcome.name, self.NOCOL))
+                for f in outcome.failures:
+                    self.__print('\t\t%s %s %s' % (self.FAIL, f, self.NOCOL))
+
+        for group_name, (passed, _) in summary.groups.items():
+            if passed:
+                self.__print("%sGroup Name: %s %s" % (self.SUCCESS, group_name, self.NOCOL))
+                self.__print('%sTotal testcase success: %s %s' % (self.SUCCESS, passed, self.NOCOL))
+
+        slowest_outcomes = self.slowest_outcomes()
+        if slowest_outcomes:
+            self.__print("========== SLOWEST TESTS ===========")
+        for index, (group_name, outcome) in enumerate(slowest_outcomes):
+            timings = outcome.timings if outcome.timings is not None else 'total %.3fs' % outcome.elapsed
+            self.__print('\t%s. %s (group %s): %s' % (index + 1, outcome.name, group_name, timings))
+
+
+class JsonLinesReporter(Reporter):
+    """ Writes every result as a JSON object on its own line, as soon as it finishes """
+
+    def __init__(self, path):
+        self.path = path
+        self.__file = open(path, 'w', encoding='utf-8', buffering=1)  # Line buffered
+
+    def report(self, group_name, outcome: TestOutcome):
+        line = dict(group=group_name, **outcome.to_dict())
+        self.__file.write(json.dumps(line) + '\n')
+
+    def close(self):
+        self.__file.close()
+
+
+class JUnitReporter(Reporter):
+    """ Writes a JUnit XML report one <testcase> at a time, the group of a test case is its classname
+
+        Nothing but the counters is kept in memory: the totals of the <testsuite> element are
+        written as fixed width placeholders first, and filled in when the report is closed.
+        Totals wider than the placeholder move the rest of the report along instead.
+    """
+
+    SUITE_NAME = 'py3resttest'
+    COUNTER_WIDTH = 20
+
+    def __init__(self, path):
+        self.path = path
+        self.__file = open(path, 'w+', encoding='utf-8', buffering=1)  # Line buffered
+        self.__counters_offset = None
+        self.placeholder_width = 0
+        self.__tests = 0
+        self.__failures = 0
+        self.__errors = 0
+        self.__time = 0.0
+
+    def __counters(self):
+        return 'tests="%d" failures="%d" errors="%d" time="%.6f"' % (
+            self.__tests, self.__failures, self.__errors, self.__time)
+
+    def start(self, summary: ResultSummary):
+        from xml.sax.saxutils import quoteattr  # saxutils pulls in urllib.request, only load it for JUnit
+
+        self.__file.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n<testsuite name=%s ' %
+                          quoteattr(self.SUITE_NAME))
+        self.__counters_offset = self.__file.tell()
+        placeholder = self.__counters().ljust(self.COUNTER_WIDTH * 4)
+        self.placeholder_width = len(placeholder)
+        self.__file.write(placeholder + '>\n')
+
+    def report(self, group_name, outcome: TestOutcome):
+        from xml.sax.saxutils import escape, quoteattr
+
+        elapsed = outcome.elapsed or 0.0
+        self.__tests += 1
+        self.__time += elapsed
+        element = '<testcase classname=%s name=%s time="%.6f"' % (
+            quoteattr(str(group_name)), quoteattr(str(outcome.name)), elapsed)
+        if outcome.is_passed:
+            self.__file.write(element + '/>\n')
+            return
+        if outcome.status_code is None:  # The transfer itself failed
+            self.__errors += 1
+            tag = 'error'
+        else:
+            self.__failures += 1
+            tag = 'failure'
+        message = outcome.failures[0] if outcome.failures else 'Failed'
+        self.__file.write('%s>\n<%s message=%s>%s</%s>\n</testcase>\n' % (
+            element, tag, quoteattr(message), escape('\n'.join(outcome.failures)), tag))
+
+    def close(self):
+        if self.__file.closed:
+            return
+        if self.__counters_offset is None:
+            self.start(ResultSummary())
+        self.__file.write('</testsuite>\n</testsuites>\n')
+        counters = self.__counters()
+        if len(counters) > self.placeholder_width:  # Would run over the first <testcase>, rewrite what follows
+            self.__file.seek(self.__counters_offset + self.placeholder_width)  # ASCII up to there
+            rest = self.__file.read()
+            self.__file.seek(self.__counters_offset)
+            self.__file.write(counters + rest)
+        else:
+            self.__file.seek(self.__counters_offset)
+            self.__file.write(counters.ljust(self.placeholder_width))
+        self.__file.close()
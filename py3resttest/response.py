@@ -0,0 +1,199 @@
+import json
+from io import BytesIO
+
+import pycurl
+
+from py3resttest.stats import Timings  # noqa: F401 (imported from here by callers)
+
+"""
+Responses kept as the raw bytes curl wrote, decoded once and parsed as JSON once, on first use
+"""
+
+_UNPARSED = object()
+
+
+class ResponseHeaders:
+    """ Case-insensitive multi-dict of response headers, filled line by line from the curl HEADERFUNCTION
+
+        Only the last header block is kept: the blocks of redirects and of `100 Continue` interim
+        responses are dropped when the next status line arrives. Trailers of a chunked body come
+        after the blank line ending a block and are added to it.
+        Iterating yields (lowercase name, value) pairs in arrival order, like the lists it replaces.
+    """
+
+    def __init__(self):
+        self.status_line = None
+        self.__items = []  # (lowercase name, value)
+        self.__index = {}  # lowercase name -> list of values
+
+    def feed(self, line):
+        """ Consume a single header line, raw bytes as curl hands them over """
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode('iso-8859-1')  # Header bytes beyond ASCII are ISO-8859-1 (RFC 7230)
+        if line.startswith((' ', '\t')):  # Folded continuation of the previous value
+            if self.__items and line.strip():
+                name, value = self.__items[-1]
+                value = value + ' ' + line.strip()
+                self.__items[-1] = (name, value)
+                self.__index[name][-1] = value
+            return
+        line = line.rstrip('\r\n')
+        if not line:  # End of a block, or of the trailers
+            return
+        if self.status_line is None or line.startswith('HTTP/'):  # Status line, a new block begins
+            self.__items = []
+            self.__index = {}
+            self.status_line = line
+            self.__block_started = True
+            return
+        name, separator, value = line.partition(':')
+        if not separator:
+            return  # Not a header, nothing sensible to keep
+        name = name.strip().lower()
+        value = value.strip()
+        self.__items.append((name, value))
+        self.__index.setdefault(name, []).append(value)
+
+    @classmethod
+    def parse(cls, header_text):
+        """ Headers of a complete header text, whose first line is the status (or request) line """
+        headers = cls()
+        if isinstance(header_text, (bytes, bytearray)):
+            header_text = header_text.decode('iso-8859-1')
+        for line in header_text.splitlines(True):
+            headers.feed(line)
+        return headers
+
+    def get_all(self, name):
+        """ Every value of the header, in arrival order, an empty list if there is none """
+        return list(self.__index.get(name.lower(), ()))
+
+    def get(self, name, default=None):
+        """ The first value of the header """
+        values = self.__index.get(name.lower())
+        return values[0] if values else default
+
+    def items(self):
+        return list(self.__items)
+
+    def __getitem__(self, name):
+        values = self.__index.get(name.lower())
+        if not values:
+            raise KeyError(name)
+        return values[0]
+
+    def __contains__(self, name):
+        return name.lower() in self.__index
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.__items)
+
+
+class ResponseBody(str):
+    """ Text of a response body, remembering the outcome of parsing it as JSON
+
+        It is a str, so extractors and validators that only need the text keep working unchanged.
+        The parsed document is shared: callers must not modify it.
+    """
+
+    def __new__(cls, content, encoding='utf-8'):
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            content = str(content, encoding)
+        body = super().__new__(cls, content)
+        body.__json = _UNPARSED
+        body.__json_error = None
+        return body
+
+    @property
+    def is_parsed(self):
+        return self.__json is not _UNPARSED or self.__json_error is not None
+
+    @property
+    def json_error(self):
+        """ The decode error of the body, None if it is valid JSON or hasn't been parsed yet """
+        return self.__json_error
+
+    def json(self):
+        """ The body parsed as JSON, raises json.JSONDecodeError (every time) if it isn't valid JSON """
+        if not self.is_parsed:
+            try:
+                self.__json = json.loads(self)
+            except ValueError as e:
+                self.__json_error = e
+        if self.__json_error is not None:
+            error = self.__json_error
+            if isinstance(error, json.JSONDecodeError):
+                raise json.JSONDecodeError(error.msg, error.doc, error.pos)
+            raise ValueError(str(error))
+        return self.__json
+
+
+# Timing metrics recorded for every request, mapped to the curl info holding them
+TIMING_METRICS = {
+    'namelookup_time': pycurl.NAMELOOKUP_TIME,
+    'connect_time': pycurl.CONNECT_TIME,
+    'appconnect_time': pycurl.APPCONNECT_TIME,
+    'pretransfer_time': pycurl.PRETRANSFER_TIME,
+    'starttransfer_time': pycurl.STARTTRANSFER_TIME,
+    'total_time': pycurl.TOTAL_TIME,
+    # The floating point size and speed infos are deprecated in favour of the integer (_T) ones
+    'size_download': getattr(pycurl, 'SIZE_DOWNLOAD_T', pycurl.SIZE_DOWNLOAD),
+    'speed_download': getattr(pycurl, 'SPEED_DOWNLOAD_T', pycurl.SPEED_DOWNLOAD),
+}
+
+
+class Response:
+    """ Outcome of a transfer: status code, headers and body, kept apart from the request that produced it
+
+        The body stays in the buffer curl wrote it to, `raw` is a memoryview over it (no copy).
+        Its text and JSON document are only produced when asked for, then shared.
+    """
+
+    def __init__(self, status_code, headers=None, content=b''):
+        self.status_code = status_code
+        self.headers = headers if headers is not None else ResponseHeaders()
+        self.__buffer = content if isinstance(content, BytesIO) else BytesIO(content)
+        self.__raw = self.__buffer.getbuffer()
+        self.__text = None
+
+    @property
+    def raw(self) -> memoryview:
+        return self.__raw
+
+    @property
+    def content(self) -> bytes:
+        """ A copy of the body bytes """
+        return self.__raw.tobytes()
+
+    @property
+    def text(self) -> ResponseBody:
+        if self.__text is None:
+            self.__text = ResponseBody(self.__raw)
+        return self.__text
+
+    def json(self):
+        """ The body parsed as JSON, see ResponseBody.json """
+        return self.text.json()
+
+    def __len__(self):
+        return self.__raw.nbytes
+
+    def close(self):
+        """ Release the body buffer, only the already decoded text (if any) remains usable """
+        self.__raw.release()
+        self.__buffer.close()
+
+
+def parse_json_body(body):
+    """ Parse a response body as JSON, only once per response when the body is a ResponseBody """
+    if isinstance(body, ResponseBody):
+        return body.json()
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        body = str(body, 'utf-8')
+    return json.loads(body)
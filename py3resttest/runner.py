@@ -2,19 +2,33 @@ import logging
 import os
 import sys
 from argparse import ArgumentParser
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List
 
-import yaml
-from alive_progress import alive_bar
+from py3resttest.selection import TestSelector
+from py3resttest.reporters import ConsoleReporter, JsonLinesReporter, JUnitReporter, ResultSummary, TestOutcome
 
-from py3resttest.testcase import TestSet
-from py3resttest.utils import register_extensions
+# Everything else (pycurl, yaml, the test case chain, alive_progress) is imported by the method needing it,
+# so `--help`, `--connect` and argument errors don't pay for it. tests/test_startup.py keeps it that way.
 
 logger = logging.getLogger('py3resttest')
 logging.basicConfig(format='%(levelname)s:%(message)s')
 
 
+@contextmanager
+def progress_bar(total):
+    """ A progress bar on terminals, whose bar() call marks a test as done, elsewhere bar() does nothing
+        alive_progress takes longer to import than a small suite takes to run, CI logs don't need it """
+    if not sys.stdout.isatty():
+        yield lambda: None
+        return
+    from alive_progress import alive_bar
+
+    with alive_bar(total) as bar:
+        yield bar
+
+
 class ArgsRunner:
 
     def __init__(self):
@@ -28,14 +42,48 @@ class ArgsRunner:
         self.insecure = None
         self.absolute_urls = None
         self.skip_term_colors = None
-
-    def args(self):
+        self.concurrency = 1
+        self.in_order = False
+        self.workers = 1
+        self.jsonl = None
+        self.junit = None
+        self.slowest = 10
+        self.name = None
+        self.group = None
+        self.tag = None
+        self.serve = None
+        self.connect = None
+
+    def args(self, argv=None):
         parser = ArgumentParser(description='usage: %prog base_url test_filename.yaml [options]')
         # parser.add_argument("--log", help="Logging level", action="store", type=str,
         #                     choices=["info", "error", "warning", "debug"])
         # parser.add_argument("--interactive", help="Interactive mode", action="store", type=str)
-        parser.add_argument("--url", help="Base URL to run tests against", action="store", type=str, required=True)
-        parser.add_argument("--test", help="Test file to use", action="store", type=str, required=True)
+        parser.add_argument("--url", help="Base URL to run tests against (required)", action="store", type=str)
+        parser.add_argument("--test", help="Test file to use (required)", action="store", type=str)
+        parser.add_argument("--concurrency", help="Number of requests to keep in flight, a test still waits for the "
+                                                  "tests whose variables it uses", action="store", type=int, default=1)
+        parser.add_argument("--in-order", help="Run the tests of a group strictly one after another in file order, "
+                                               "instead of overlapping the tests that share no variables",
+                            action="store_true", default=False)
+        parser.add_argument("--workers", help="Number of processes to shard the test groups across",
+                            action="store", type=int, default=1)
+        parser.add_argument("--jsonl", help="File to write each test result to, as a JSON line, as soon as it "
+                                            "finishes", action="store", type=str)
+        parser.add_argument("--junit", help="File to write a JUnit XML report to, as the tests finish",
+                            action="store", type=str)
+        parser.add_argument("--slowest", help="Number of slowest tests to list with their curl timings, 0 for none",
+                            action="store", type=int, default=10)
+        parser.add_argument("--name", help="Only run the tests whose name matches this glob, or regex when prefixed "
+                                           "with 're:' (repeatable)", action="append", type=str)
+        parser.add_argument("--group", help="Only run the tests of the groups matching this glob, or regex when "
+                                            "prefixed with 're:' (repeatable)", action="append", type=str)
+        parser.add_argument("--tag", help="Only run the tests with a tag matching this glob, or regex when prefixed "
+                                          "with 're:' (repeatable)", action="append", type=str)
+        parser.add_argument("--serve", help="Keep a warm process serving runs on this Unix socket, with the parsed "
+                                            "test files and connections kept between runs", action="store", type=str)
+        parser.add_argument("--connect", help="Hand the run to the process serving on this Unix socket and print its "
+                                              "results", action="store", type=str)
         # parser.add_argument('--vars', help='Variables to set, as a YAML dictionary', action="store", type=str)
         # parser.add_argument(u'--insecure', help='Disable cURL host and peer cert verification', action='store_true',
         #                     default=False)
@@ -44,86 +92,153 @@ class ArgsRunner:
         # parser.add_argument(u'--skip_term_colors', help='Turn off the output term colors',
         #                     action='store_true', default=False)
 
-        parser.parse_args(namespace=self)
+        parser.parse_args(argv, namespace=self)
+        if not self.serve and (self.url is None or self.test is None):
+            parser.error("the following arguments are required: --url, --test")
 
 
 class Runner:
 
-    FAIL = '\033[91m'
-    SUCCESS = '\033[92m'
-    NOCOL = '\033[0m'
+    FAIL = ConsoleReporter.FAIL
+    SUCCESS = ConsoleReporter.SUCCESS
+    NOCOL = ConsoleReporter.NOCOL
 
-    def __init__(self):
-        self.__args = ArgsRunner()
+    def __init__(self, args: ArgsRunner = None, pool=None):
+        self.__args = args if args is not None else ArgsRunner()
+        self.__pool = pool
+
+    @property
+    def pool(self):
+        """ The CurlPool of the runner, created on first use """
+        if self.__pool is None:
+            from py3resttest.pool import CurlPool
+
+            self.__pool = CurlPool()
+        return self.__pool
 
     @staticmethod
     def read_test_file(file_location: str) -> List[Dict]:
-        with open(file_location, 'r') as f:
-            test_dict = yaml.safe_load(f.read())
-        return test_dict
+        from py3resttest.utils import read_testcase_file
+
+        return read_testcase_file(file_location)
 
     def main(self) -> int:
         self.__args.args()  # Set the arguments
         logger.setLevel(self.__args.log)
+        if self.__args.serve:
+            from py3resttest.daemon import serve
+            self.load_extensions(os.getcwd())  # Loaded once, for every run it serves
+            return serve(self.__args.serve)
+        if self.__args.connect:
+            from py3resttest.daemon import RunClient
+            return RunClient(self.__args.connect).run(self.__args, self)
 
         # If user provided any custom extension add it into the system path and import it
-        working_folder = os.path.realpath(os.path.abspath(os.getcwd()))
-        if self.__args.extensions is not None:
+        self.load_extensions(os.getcwd())
+        testcase_set, selector = self.build_test_set()
+        total_testcase_count = len([y for x, y in testcase_set.test_group_list_dict.items() for c in y.testcase_list])
+        self.report(total_testcase_count, lambda on_complete: self.run_tests(testcase_set, selector, on_complete))
+        self.run_benchmarks(testcase_set.test_group_list_dict)
+        print("========== CONNECTIONS ===========")
+        print(self.pool.stats)
+        self.pool.close()
+        return 0
 
-            if working_folder not in sys.path:
-                sys.path.insert(0, working_folder)
-            register_extensions(self.__args.extensions)
-        p = Path(self.__args.test)
+    def load_extensions(self, working_folder):
+        """ Import the extensions of the arguments, found from the working folder too """
+        if self.__args.extensions is None:
+            return
+        from py3resttest.utils import register_extensions
+
+        working_folder = os.path.realpath(os.path.abspath(working_folder))
+        if working_folder not in sys.path:
+            sys.path.insert(0, working_folder)
+        register_extensions(self.__args.extensions)
+
+    def build_test_set(self):
+        """ The TestSet of the test file and the TestSelector it was built with (None when running everything) """
+        from py3resttest.testcase import TestSet
 
+        p = Path(self.__args.test)
         test_case_dict = self.read_test_file(p.absolute())
+        selector = TestSelector(names=self.__args.name, groups=self.__args.group, tags=self.__args.tag)
+        selector = selector if selector.is_selective else None
         testcase_set = TestSet()
-        testcase_set.parse(self.__args.url, testcase_list=test_case_dict, working_directory=p.parent.absolute())
-
-        success_dict = {}
-        failure_dict = {}
-        total_testcase_count = len([y for x, y in testcase_set.test_group_list_dict.items() for c in y.testcase_list])
-        with alive_bar(total_testcase_count) as bar:
-            for test_group, test_group_object in testcase_set.test_group_list_dict.items():
-                for testcase_object in test_group_object.testcase_list:
-                    bar()
-                    testcase_object.run()
-                    if testcase_object.is_passed:
-                        try:
-                            (count, case_list) = success_dict[test_group]
-                            case_list.append(testcase_object)
-                            success_dict[test_group] = (count + 1, case_list)
-                        except KeyError:
-                            success_dict[test_group] = (1, [testcase_object])
-                    else:
-                        try:
-                            count, case_list = failure_dict[test_group]
-                            case_list.append(testcase_object)
-                            failure_dict[test_group] = (count + 1, case_list)
-                        except KeyError:
-                            failure_dict[test_group] = (1, [testcase_object])
-        print("========== TEST RESULT ===========")
-        print("Total Test to run: %s" % total_testcase_count)
-        for group_name, case_list_tuple in failure_dict.items():
-            print("%sGroup Name: %s %s" % (self.FAIL, group_name, self.NOCOL))
-            count, courtcase_list = case_list_tuple
-            print('%sTotal testcase failed: %s %s' % (self.FAIL, count, self.NOCOL))
-            for index, testcase in enumerate(courtcase_list):
-                print('\t%s %s. Case Name: %s %s' % (self.FAIL, index+1, testcase.name, self.NOCOL))
-                for f in testcase.failures:
-                    print('\t\t%s %s %s' % (self.FAIL, f, self.NOCOL))
-
-        for group_name, case_list_tuple in success_dict.items():
-            print("%sGroup Name: %s %s" % (self.SUCCESS, group_name, self.NOCOL))
-            count, courtcase_list = case_list_tuple
-            print('%sTotal testcase success: %s %s' % (self.SUCCESS, count, self.NOCOL))
-            for index, testcase in enumerate(courtcase_list):
-                print('\t%s %s. Case Name: %s %s' % (self.SUCCESS, index+1, testcase.name, self.NOCOL))
-        return 0
+        testcase_set.parse(self.__args.url, testcase_list=test_case_dict, working_directory=p.parent.absolute(),
+                           selector=selector)
+        return testcase_set, selector
+
+    def run_tests(self, testcase_set, selector, callback: Callable):
+        """ Run the test cases, calling callback(group name, TestCase or TestOutcome) as each one finishes """
+        if self.__args.workers > 1:
+            from py3resttest.workers import WorkerPool
+
+            worker_pool = WorkerPool(self.__args.workers, concurrency=self.__args.concurrency,
+                                     ordered=self.__args.in_order, extensions=self.__args.extensions,
+                                     selector=selector)
+            worker_pool.run(self.__args.url, Path(self.__args.test).absolute(), testcase_set.test_group_list_dict,
+                            callback=callback)
+            self.pool.stats.merge(worker_pool.stats)
+        else:
+            from py3resttest.engine import CurlMultiEngine
+
+            engine = CurlMultiEngine(concurrency=self.__args.concurrency, pool=self.pool,
+                                     ordered=self.__args.in_order)
+            engine.run(testcase_set.test_group_list_dict, callback=callback)
+
+    def report(self, total_testcase_count: int, execute: Callable):
+        """ Hand the results of execute(on_complete) to the reporters of the arguments, with a progress bar """
+        summary = ResultSummary(total_testcase_count)
+        reporters = [ConsoleReporter(slowest=self.__args.slowest)]
+        if self.__args.jsonl:
+            reporters.append(JsonLinesReporter(self.__args.jsonl))
+        if self.__args.junit:
+            reporters.append(JUnitReporter(self.__args.junit))
+        for reporter in reporters:
+            reporter.start(summary)
+
+        def on_complete(test_group, testcase_object):
+            bar()
+            if isinstance(testcase_object, TestOutcome):  # Already summarized by a worker
+                outcome = testcase_object
+            else:
+                outcome = TestOutcome.from_testcase(testcase_object)
+                testcase_object.release_response()
+            summary.record(test_group, outcome)
+            for result_reporter in reporters:
+                result_reporter.report(test_group, outcome)
+
+        with progress_bar(total_testcase_count) as bar:
+            execute(on_complete)
+        for reporter in reporters:
+            reporter.finish(summary)
+            reporter.close()
+        return summary
+
+    def run_benchmarks(self, test_group_list_dict: Dict, stream=None, directory=None):
+        """ Run the benchmarks one at a time after the tests, so they don't compete for the network
+            Relative output files are written under directory, the working directory by default """
+        benchmark_list = [b for group_object in test_group_list_dict.values() for b in group_object.benchmark_list]
+        if not benchmark_list:
+            return
+        from py3resttest.benchmarks import write_benchmark_result
+
+        print("========== BENCHMARK RESULT ===========", file=stream)
+        for benchmark in benchmark_list:
+            curl_handler = self.pool.acquire(benchmark.url)
+            result = benchmark.run(curl_handler=curl_handler)
+            self.pool.release(curl_handler)
+            write_benchmark_result(benchmark, result, directory=directory)
+            colour = self.FAIL if result.failures else self.SUCCESS
+            print("%sBenchmark: %s, failures: %s %s" % (colour, benchmark.name, result.failures, self.NOCOL),
+                  file=stream)
+            for metric_name, aggregate_name, value in result.aggregates:
+                print("\t%s %s: %s" % (metric_name, aggregate_name, value), file=stream)
 
 
 def main():
     r = Runner()
-    r.main()
+    sys.exit(r.main())
 
 
 if __name__ == '__main__':
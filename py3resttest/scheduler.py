@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import List, Optional, Set
+
+"""
+Dependency graph of the test cases of a group, so tests that don't share variables can run at the same time
+"""
+
+
+def written_variables(testcase, static_binds: Set[str]) -> Set[str]:
+    """ Names of the context variables running testcase may change
+
+        Variables in static_binds are bound to the same value by every test of the group,
+        rebinding them changes nothing so they are left out.
+    """
+    names = set(testcase.extract_binds) | set(testcase.generator_binds)
+    names.update(name for name in testcase.variable_binds if name not in static_binds)
+    return names
+
+
+def static_variable_binds(testcase_list: List) -> Set[str]:
+    """ Names of the variables every test of the list binds to one and the same value, and nothing else sets """
+    values = defaultdict(set)
+    dynamic = set()
+    for testcase in testcase_list:
+        for name, value in testcase.variable_binds.items():
+            values[name].add(repr(value))
+        dynamic.update(testcase.extract_binds)
+        dynamic.update(testcase.generator_binds)
+    return {name for name, value_set in values.items() if len(value_set) == 1 and name not in dynamic}
+
+
+def _conflicts(reads_a: Optional[Set[str]], writes_a: Set[str], reads_b: Optional[Set[str]], writes_b: Set[str]):
+    """ Do two tests touch the same variable with at least one of them writing it
+        None reads stand for "any variable" """
+    if writes_a & writes_b:
+        return True
+    if writes_a and (reads_b is None or writes_a & reads_b):
+        return True
+    if writes_b and (reads_a is None or writes_b & reads_a):
+        return True
+    return False
+
+
+def build_dependencies(testcase_list: List) -> List[Set[int]]:
+    """ For each test, the indexes of the earlier tests it must wait for
+
+        A test waits for an earlier one when either writes a variable the other reads or writes,
+        with reads coming from templated URLs, headers, bodies, extractors and validators.
+        A test with a delay waits for every earlier test, as the delay is relative to them.
+    """
+    static_binds = static_variable_binds(testcase_list)
+    reads = [testcase.template_variables() for testcase in testcase_list]
+    writes = [written_variables(testcase, static_binds) for testcase in testcase_list]
+
+    dependencies = []
+    for index, testcase in enumerate(testcase_list):
+        if testcase.delay:
+            dependencies.append(set(range(index)))
+            continue
+        dependencies.append({
+            earlier for earlier in range(index)
+            if _conflicts(reads[earlier], writes[earlier], reads[index], writes[index])
+        })
+    return dependencies
+
+
+class DependencyGraph:
+    """ Tracks which test cases of a group are ready to run
+
+        With ordered=True every test depends on the one before it, so tests run one by one in file order.
+    """
+
+    def __init__(self, testcase_list: List, ordered=False):
+        self.testcase_list = list(testcase_list)
+        if ordered:
+            self.dependencies = [{index - 1} if index else set() for index in range(len(self.testcase_list))]
+        else:
+            self.dependencies = build_dependencies(self.testcase_list)
+
+        self.__waiting_on = [len(dependency_set) for dependency_set in self.dependencies]
+        self.__dependents = defaultdict(list)  # index -> indexes of the tests waiting for it
+        for index, dependency_set in enumerate(self.dependencies):
+            for earlier in dependency_set:
+                self.__dependents[earlier].append(index)
+        self.__ready = [index for index, count in enumerate(self.__waiting_on) if not count]
+        self.__remaining = len(self.testcase_list)
+
+    @property
+    def is_finished(self):
+        return not self.__remaining
+
+    def ready(self) -> List[int]:
+        """ Indexes of the tests whose dependencies are all done and that haven't been handed out yet """
+        return sorted(self.__ready)
+
+    def start(self, index):
+        self.__ready.remove(index)
+
+    def finish(self, index):
+        self.__remaining -= 1
+        for later in self.__dependents.pop(index, ()):
+            self.__waiting_on[later] -= 1
+            if not self.__waiting_on[later]:
+                self.__ready.append(later)
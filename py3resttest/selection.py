@@ -0,0 +1,76 @@
+import fnmatch
+import re
+from typing import Iterable, List, Optional
+
+"""
+Selection of the tests to run by name, group and tag, applied while the test file is parsed
+"""
+
+REGEX_PREFIX = 're:'
+
+
+class TestSelector:
+    """ Decides which tests are built, from glob (or `re:` prefixed regex) patterns
+
+        A test is selected when it matches at least one pattern of every kind given:
+        its name one of the name patterns, its group one of the group patterns
+        and one of its tags one of the tag patterns. Kinds without patterns select everything.
+    """
+
+    def __init__(self, names: Optional[Iterable[str]] = None, groups: Optional[Iterable[str]] = None,
+                 tags: Optional[Iterable[str]] = None):
+        self.names = list(names or [])
+        self.groups = list(groups or [])
+        self.tags = list(tags or [])
+        self.__name_patterns = self.compile(self.names)
+        self.__group_patterns = self.compile(self.groups)
+        self.__tag_patterns = self.compile(self.tags)
+
+    @staticmethod
+    def compile(pattern_list: List[str]) -> List:
+        """ Compiled regular expressions of glob or `re:` prefixed patterns
+            Globs must match the whole value, regexes anywhere in it (anchor them if need be) """
+        compiled_list = []
+        for pattern in pattern_list:
+            if pattern.startswith(REGEX_PREFIX):
+                try:
+                    compiled_list.append(re.compile(pattern[len(REGEX_PREFIX):]))
+                except re.error as e:
+                    raise ValueError("Invalid selection pattern %s: %s" % (pattern, e))
+            else:
+                compiled_list.append(re.compile(r'\A' + fnmatch.translate(pattern)))
+        return compiled_list
+
+    @property
+    def is_selective(self):
+        return bool(self.names or self.groups or self.tags)
+
+    @staticmethod
+    def __any_match(pattern_list, value_list):
+        return any(pattern.search(value) for pattern in pattern_list for value in value_list)
+
+    def matches(self, name, group, tags=None) -> bool:
+        if self.__name_patterns and not self.__any_match(self.__name_patterns, [str(name)]):
+            return False
+        if self.__group_patterns and not self.__any_match(self.__group_patterns, [str(group)]):
+            return False
+        if self.__tag_patterns and not self.__any_match(self.__tag_patterns, [str(tag) for tag in tags or []]):
+            return False
+        return True
+
+    def __getstate__(self):  # Sent to worker processes as patterns
+        return {'names': self.names, 'groups': self.groups, 'tags': self.tags}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+def parse_tags(value) -> List[str]:
+    """ Tags of a test, given as a list or a comma separated string """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, (list, tuple, set)):
+        value = [value]
+    return [str(tag).strip() for tag in value if str(tag).strip()]
@@ -0,0 +1,83 @@
+"""
+Figures of finished transfers, kept free of pycurl so a client of a serving process can rebuild them
+"""
+
+
+class ConnectionStats:
+    """ Counts how many transfers needed a new connection and how many reused one """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+
+    def record(self, num_connects):
+        self.requests += 1
+        if num_connects:
+            self.new_connections += num_connects
+        else:
+            self.reused_connections += 1
+
+    def merge(self, other):
+        """ Add up the counts of another ConnectionStats, e.g. one from a worker process """
+        self.requests += other.requests
+        self.new_connections += other.new_connections
+        self.reused_connections += other.reused_connections
+
+    def to_dict(self):
+        return {'requests': self.requests, 'new_connections': self.new_connections,
+                'reused_connections': self.reused_connections}
+
+    @classmethod
+    def from_dict(cls, stats_dict):
+        stats = cls()
+        stats.requests = stats_dict.get('requests', 0)
+        stats.new_connections = stats_dict.get('new_connections', 0)
+        stats.reused_connections = stats_dict.get('reused_connections', 0)
+        return stats
+
+    def __str__(self):
+        return "Requests: {0}, new connections: {1}, reused connections: {2}".format(
+            self.requests, self.new_connections, self.reused_connections)
+
+
+class Timings:
+    """ libcurl timings (seconds from the start of the transfer) and download figures of one request
+
+        Slotted, so keeping one for every test of a large suite stays cheap.
+    """
+
+    METRICS = ('namelookup_time', 'connect_time', 'appconnect_time', 'pretransfer_time', 'starttransfer_time',
+               'total_time', 'size_download', 'speed_download')
+    __slots__ = METRICS
+
+    def __init__(self, **values):
+        for metric in self.METRICS:
+            setattr(self, metric, values.get(metric, 0.0))
+
+    @classmethod
+    def from_curl(cls, curl_handler):
+        from py3resttest.response import TIMING_METRICS  # Only a process running transfers needs pycurl
+
+        return cls(**{metric: curl_handler.getinfo(info) for metric, info in TIMING_METRICS.items()})
+
+    def get(self, metric):
+        """ Value of a metric by name, ValueError for unknown metrics """
+        if metric not in self.METRICS:
+            raise ValueError("Unknown timing metric %s, available metrics are %s" % (metric, ', '.join(self.METRICS)))
+        return getattr(self, metric)
+
+    def to_dict(self):
+        return {metric: getattr(self, metric) for metric in self.METRICS}
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        for metric in self.METRICS:
+            setattr(self, metric, state.get(metric, 0.0))
+
+    def __str__(self):
+        return 'dns %.3fs, connect %.3fs, tls %.3fs, first byte %.3fs, total %.3fs, %d bytes' % (
+            self.namelookup_time, self.connect_time, self.appconnect_time, self.starttransfer_time,
+            self.total_time, self.size_download)
@@ -0,0 +1,83 @@
+import string
+from functools import lru_cache
+
+from py3resttest.binding import Context
+
+"""
+string.Template compatible templates, compiled once and rendered again only when their variables change
+"""
+
+
+class CompiledTemplate:
+    """ A template split into literal text and variable segments
+
+        Renders exactly like string.Template(template).safe_substitute(values).
+        Rendering against a Context is cached, the cache holds while the Context keeps the versions
+        of the variables this template references. Compiled templates are shared by every test plan of
+        the process, so the cache entry is replaced as a whole and threads never see half of one.
+    """
+
+    def __init__(self, template):
+        self.template = str(template)
+        self.segments = []  # list of (literal text, None) or (raw placeholder text, variable name)
+        names = []
+        position = 0
+        literal = []
+        for match in string.Template.pattern.finditer(self.template):
+            literal.append(self.template[position:match.start()])
+            position = match.end()
+            name = match.group('named') or match.group('braced')
+            if name is None:  # Escaped or invalid delimiter
+                literal.append('$' if match.group('escaped') is not None else match.group(0))
+                continue
+            self.segments.append((''.join(literal), None))
+            literal = []
+            self.segments.append((match.group(0), name))
+            if name not in names:
+                names.append(name)
+        literal.append(self.template[position:])
+        self.segments.append((''.join(literal), None))
+        self.segments = [segment for segment in self.segments if segment[0] or segment[1]]
+        self.variables = tuple(names)
+        self.__static_output = None if names else self.substitute({})
+
+        self.__cache = (None, None, None)  # (context, key, output)
+
+    @property
+    def is_static(self):
+        return not self.variables
+
+    def substitute(self, values) -> str:
+        """ Render against a mapping of variable values, without caching """
+        output = []
+        for text, name in self.segments:
+            if name is None:
+                output.append(text)
+            elif name in values:
+                output.append('%s' % (values[name],))
+            else:
+                output.append(text)
+        return ''.join(output)
+
+    def render(self, context) -> str:
+        """ Render against a Context (cached) or a plain mapping of variable values """
+        if self.is_static:
+            return self.__static_output
+        if not isinstance(context, Context):
+            return self.substitute(context or {})
+
+        key = (id(context.variables), context.get_versions(self.variables))
+        cache_context, cache_key, output = self.__cache
+        if cache_context is not context or cache_key != key:
+            output = self.substitute(context.get_values())
+            self.__cache = (context, key, output)
+        return output
+
+    def __str__(self):
+        return self.template
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template) -> CompiledTemplate:
+    """ Compiled template for a template string, shared by everyone using the same text """
+    return CompiledTemplate(template)
@@ -1,7 +1,6 @@
 import json
 import logging
 import os
-import string
 import time
 import traceback
 from io import BytesIO
@@ -14,12 +13,16 @@ import pycurl
 from py3resttest.binding import Context
 from py3resttest.constants import (
     AuthType, YamlKeyWords, TestCaseKeywords, DEFAULT_TIMEOUT, EnumHttpMethod, FAILURE_CURL_EXCEPTION,
-    FAILURE_TEST_EXCEPTION, FAILURE_INVALID_RESPONSE
+    FAILURE_INVALID_RESPONSE
 )
 from py3resttest.contenthandling import ContentHandler
 from py3resttest.exception import HttpMethodError, BindError, ValidatorError
 from py3resttest.generators import parse_generator
-from py3resttest.utils import read_testcase_file, ChangeDir, Parser
+from py3resttest.response import Response, ResponseHeaders
+from py3resttest.selection import TestSelector, parse_tags
+from py3resttest.stats import Timings
+from py3resttest.templating import compile_template
+from py3resttest.utils import read_testcase_file, read_testcase_files, Parser, ResolvePaths
 from py3resttest.validators import parse_extractor, parse_validator, Failure
 
 logger = logging.getLogger('py3resttest')
@@ -35,6 +38,7 @@ class TestCaseConfig:
         self.timeout = 60
         self.print_bodies = False
         self.retries = 0
+        self.keep_alive = True
         self.generators = {}
 
     @property
@@ -57,6 +61,8 @@ class TestCaseConfig:
                 self.print_bodies = Parser.safe_to_bool(value)
             elif key == 'retries':
                 self.retries = int(value)
+            elif key == 'keep_alive':
+                self.keep_alive = Parser.safe_to_bool(value)
             elif key == 'variable_binds':
                 self.variable_binds = value
             elif key == u'generators':
@@ -74,25 +80,40 @@ class TestCaseConfig:
 
 
 class TestSet:
-    __testcase_file = set()
-    test_group_list_dict = {}
+    """ The test plan of a test file: its groups of test cases and benchmarks, and the files it was built from
+
+        Every TestSet owns its groups, so several plans (other files, other base URLs) can be built and run
+        side by side in one process. Use merge() to combine plans.
+    """
 
     def __init__(self):
+        self.test_group_list_dict = {}  # group name -> TestCaseGroup
+        self.__testcase_file = set()  # Files already included or imported, never built twice
         self.__context = Context()
         self.__extract_binds = {}
         self.__variable_binds = {}
         self.config = TestCaseConfig()
+        self.selector = None  # TestSelector of the tests to build, None builds them all
 
-    def parse(self, base_url: str, testcase_list: List, test_file=None, working_directory=None, variable_dict=None):
+    def parse(self, base_url: str, testcase_list: List, test_file=None, working_directory=None, variable_dict=None,
+              selector: Optional[TestSelector] = None, content_directory=None):
+        """ Build the test cases and benchmarks of a test file
+            Includes and imports are found from the working directory, the relative paths of file content
+            from content_directory: the directory of the file the content is defined in (default: working directory).
+            With a selector, only the tests it selects are built, for this file and the files it includes """
 
         if working_directory is None:
             working_directory = Path(os.path.abspath(os.getcwd()))
         else:
             working_directory = Path(working_directory)
+        if content_directory is None:
+            content_directory = working_directory
         if variable_dict is None:
             self.config.variable_binds = variable_dict
         if test_file:
             self.__testcase_file.add(test_file)
+        if selector is not None:
+            self.selector = selector
 
         testcase_config_object = TestCaseConfig()
         for testcase_node in testcase_list:
@@ -106,14 +127,19 @@ class TestSet:
                 if key == YamlKeyWords.INCLUDE:
                     if not isinstance(sub_testcase_node, list):
                         raise ValueError("include should be list not %s" % type(sub_testcase_node))
+                    testcase_file_list = []
                     for testcase_file_path in sub_testcase_node:
                         testcase_file_path = testcase_file_path.replace('.', '/')
                         testcase_file = str(working_directory.joinpath("%s.yaml" % testcase_file_path).resolve())
+                        if testcase_file not in self.__testcase_file and testcase_file not in testcase_file_list:
+                            testcase_file_list.append(testcase_file)
+                    # Read them all at once, but build them in order: a file may include one of the next ones
+                    for testcase_file, import_testcase_list in zip(
+                            testcase_file_list, read_testcase_files(testcase_file_list)):
                         if testcase_file not in self.__testcase_file:
                             self.__testcase_file.add(testcase_file)
-                            import_testcase_list = read_testcase_file(testcase_file)
-                            with ChangeDir(working_directory):
-                                self.parse(base_url, import_testcase_list, variable_dict=variable_dict)
+                            self.parse(base_url, import_testcase_list, working_directory=working_directory,
+                                       variable_dict=variable_dict, content_directory=os.path.dirname(testcase_file))
                 elif key == YamlKeyWords.IMPORT:
                     if sub_testcase_node not in self.__testcase_file:
                         testcase_file_path = sub_testcase_node
@@ -121,11 +147,13 @@ class TestSet:
                         testcase_file_path = str(working_directory.joinpath("%s" % testcase_file_path).resolve())
                         self.__testcase_file.add(sub_testcase_node)
                         import_testcase_list = read_testcase_file(testcase_file_path)
-                        with ChangeDir(working_directory):
-                            self.parse(base_url, import_testcase_list, variable_dict=variable_dict)
+                        self.parse(base_url, import_testcase_list, working_directory=working_directory,
+                                   variable_dict=variable_dict, content_directory=os.path.dirname(testcase_file_path))
                 elif key == YamlKeyWords.URL:
+                    if self.selector and not self.selector.matches(TestCase.DEFAULT_NAME, TestCaseGroup.DEFAULT_GROUP):
+                        continue
                     __group_name = TestCaseGroup.DEFAULT_GROUP
-                    group_object = TestSet.__create_test(__group_name, testcase_config_object)
+                    group_object = self.__create_test(__group_name, testcase_config_object)
                     testcase_object = TestCase(
                         base_url=base_url, extract_binds=group_object.extract_binds,
                         variable_binds=group_object.variable_binds, context=group_object.context,
@@ -135,22 +163,60 @@ class TestSet:
                     group_object.testcase_list = testcase_object
 
                 elif key == YamlKeyWords.TEST:
-                    with ChangeDir(working_directory):
-                        self.parse_test(base_url, sub_testcase_node, testcase_config_object)
+                    with ResolvePaths(content_directory):
+                        self.parse_test(base_url, sub_testcase_node, testcase_config_object, self.selector)
+
+                elif key == YamlKeyWords.BENCHMARK:
+                    with ResolvePaths(content_directory):
+                        self.parse_benchmark(base_url, sub_testcase_node, testcase_config_object, self.selector)
 
                 elif key == YamlKeyWords.CONFIG:
                     testcase_config_object.parse(sub_testcase_node)
 
         self.config = testcase_config_object
 
+    @property
+    def testcase_files(self) -> frozenset:
+        """ The files this plan was built from, including the ones it included or imported """
+        return frozenset(self.__testcase_file)
+
+    def merge(self, other: 'TestSet') -> 'TestSet':
+        """ Add the groups of another plan to this one and return this plan
+            The test cases and benchmarks of a group both plans have are appended to this plan's group,
+            they keep the context and binds they were built with. Files the other plan was built from are
+            not included again by later parses of this plan. """
+        if other is self:
+            return self
+        for group_name, other_group in other.test_group_list_dict.items():
+            group_object = self.test_group_list_dict.get(group_name)
+            if group_object is None:
+                self.test_group_list_dict[group_name] = other_group
+                continue
+            for testcase_object in other_group.testcase_list:
+                group_object.testcase_list = testcase_object
+            for benchmark_object in other_group.benchmark_list:
+                group_object.benchmark_list = benchmark_object
+        self.__testcase_file.update(other.testcase_files)
+        return self
+
     @staticmethod
-    def parse_test(base_url, sub_testcase_node, testcase_config_object):
+    def is_selected(sub_testcase_node, group_name, selector: Optional[TestSelector]) -> bool:
+        """ Does the selector want the test of this node, checked before anything of it is built """
+        if not selector:
+            return True
+        node = Parser.flatten_lowercase_keys_dict(sub_testcase_node)
+        return selector.matches(node.get(TestCaseKeywords.name, TestCase.DEFAULT_NAME), group_name,
+                                parse_tags(node.get(TestCaseKeywords.tags)))
+
+    def parse_test(self, base_url, sub_testcase_node, testcase_config_object, selector=None):
         __group_name = None
         for node_dict in sub_testcase_node:
             if __group_name is None:
                 __group_name = node_dict.get(TestCaseKeywords.group)
         __group_name = __group_name if __group_name else TestCaseGroup.DEFAULT_GROUP
-        group_object = TestSet.__create_test(__group_name, testcase_config_object)
+        if not TestSet.is_selected(sub_testcase_node, __group_name, selector):
+            return
+        group_object = self.__create_test(__group_name, testcase_config_object)
         testcase_object = TestCase(
             base_url=base_url, extract_binds=group_object.extract_binds,
             variable_binds=group_object.variable_binds, context=group_object.context,
@@ -159,13 +225,28 @@ class TestSet:
         testcase_object.parse(sub_testcase_node)
         group_object.testcase_list = testcase_object
 
-    @staticmethod
-    def __create_test(__group_name, testcase_config_object):
+    def parse_benchmark(self, base_url, sub_testcase_node, testcase_config_object, selector=None):
+        from py3resttest.benchmarks import Benchmark  # benchmarks builds on TestCase, import late
+
+        __group_name = Parser.flatten_lowercase_keys_dict(sub_testcase_node).get(TestCaseKeywords.group)
+        __group_name = __group_name if __group_name else TestCaseGroup.DEFAULT_GROUP
+        if not TestSet.is_selected(sub_testcase_node, __group_name, selector):
+            return
+        group_object = self.__create_test(__group_name, testcase_config_object)
+        benchmark_object = Benchmark(
+            base_url=base_url, extract_binds=None,
+            variable_binds=group_object.variable_binds, context=group_object.context,
+            config=group_object.config
+        )
+        benchmark_object.parse(sub_testcase_node)
+        group_object.benchmark_list = benchmark_object
+
+    def __create_test(self, __group_name, testcase_config_object):
         try:
-            group_object = TestSet.test_group_list_dict[__group_name]
+            group_object = self.test_group_list_dict[__group_name]
         except KeyError:
-            group_object = TestCaseGroup(TestCaseGroup.DEFAULT_GROUP, config=testcase_config_object)
-            TestSet.test_group_list_dict[__group_name] = group_object
+            group_object = TestCaseGroup(__group_name, config=testcase_config_object)
+            self.test_group_list_dict[__group_name] = group_object
         return group_object
 
 
@@ -186,6 +267,10 @@ class TestCaseGroup:
 
         self.config = config
 
+    @property
+    def name(self):
+        return self.__name
+
     @property
     def testcase_list(self):
         return self.__testcase_list
@@ -278,14 +363,15 @@ class TestCase:
         self.__base_url = base_url
         self.__url = None
         self.__body = None
+        self.__rendered_body = None  # The body as rendered for the current run, __body keeps its template
         self.__config = config if config else TestCaseConfig()
         self.__auth_username = None
         self.__auth_password = None
         self.__delay = 0
         self.__verbose = False
         self.__ssl_insecure = False
-        self.__response_headers = None
-        self.__response_code = None
+        self.__response = None
+        self.__timings = None
         self.__passed = False
         self.__failure_list = []
         self.__abs_url = False
@@ -294,6 +380,7 @@ class TestCase:
         self.__http_method = EnumHttpMethod.GET.name
         self.__group = TestCaseGroup.DEFAULT_GROUP
         self.__name = TestCase.DEFAULT_NAME
+        self.__tags = []
         self._should_stop_on_failure = False
         self._test_run_delay = 0
         self._auth_type = AuthType.BASIC
@@ -308,6 +395,8 @@ class TestCase:
 
         self.templates = {}
         self.result = None
+        self.__curl_buffers = None
+        self.__request_stream = None
         self.config = config
 
     def __str__(self):
@@ -345,7 +434,7 @@ class TestCase:
 
     @http_method.setter
     def http_method(self, method: str):
-        __method = ["GET", "PUT", "POST", "DELETE", "PATCH"]
+        __method = ["GET", "PUT", "POST", "DELETE", "PATCH", "HEAD"]
         if method.upper() not in __method:
             raise HttpMethodError("Method %s is not supported." % method)
         self.__http_method = method.upper()
@@ -354,6 +443,14 @@ class TestCase:
     def name(self):
         return self.__name
 
+    @property
+    def tags(self) -> List[str]:
+        return self.__tags
+
+    @tags.setter
+    def tags(self, value):
+        self.__tags = parse_tags(value)
+
     @property
     def group(self):
         return self.__group
@@ -362,6 +459,16 @@ class TestCase:
     def is_passed(self):
         return bool(self.__passed)
 
+    @property
+    def timings(self) -> Optional[Timings]:
+        """ curl timings of the last transfer, None before the first run """
+        return self.__timings
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        """ Seconds the last transfer took according to curl, None before the first run """
+        return self.__timings.total_time if self.__timings is not None else None
+
     @property
     def url(self):
         val = self.realize_template("url", self.__context)
@@ -447,19 +554,16 @@ class TestCase:
     def headers(self) -> Dict:
         # if not self.templates.get('headers'):
         #     return self.__header_dict
-        context_values = self.__context.get_values()
         header_dict = {}
         for key, header in self.__header_dict.items():
             if isinstance(header, dict):
                 if key == 'template':
                     for k, v in header.items():
-                        templated_string = string.Template(v).safe_substitute(context_values)
-                        header_dict[k] = templated_string
+                        header_dict[k] = compile_template(v).render(self.__context)
                     continue
                 templated_value = header.get('template')
                 if templated_value:
-                    templated_string = string.Template(templated_value).safe_substitute(context_values)
-                    header_dict[key] = templated_string
+                    header_dict[key] = compile_template(templated_value).render(self.__context)
                 else:
                     logger.warning("Skipping the header: %s. We don't support mapping as header" % header)
             else:
@@ -480,23 +584,33 @@ class TestCase:
             raise ValidatorError("Illegal header type: headers must be a dictionary or list of dictionary keys")
 
     def set_template(self, variable_name, template_string):
-        self.templates[variable_name] = string.Template(str(template_string))
+        self.templates[variable_name] = compile_template(str(template_string))
 
     @property
     def body(self):
+        if self.__rendered_body is not None:
+            return self.__rendered_body
         if isinstance(self.__body, str) or self.__body is None:
             return self.__body
         return self.__body.get_content(context=self.__context)
 
     @body.setter
     def body(self, value):
+        self.__rendered_body = None
         if value:
             if isinstance(value, bytes):
                 self.__body = ContentHandler.parse_content(value.decode())
-            elif isinstance(value, str):
+            elif isinstance(value, (str, dict, list)):
                 self.__body = ContentHandler.parse_content(value)
             else:
                 self.__body = value
+            if isinstance(self.__body, ContentHandler) and self.__body.is_file and not self.__body.is_template_path:
+                try:  # Static file, read it once (through the content cache) instead of on every access
+                    if not (self.__body.is_streamable() and
+                            os.path.getsize(self.__body.content) >= ContentHandler.STREAM_THRESHOLD):
+                        self.__body = self.__body.create_noread_version()
+                except OSError:
+                    pass  # Reported when the test runs
         else:
             self.__body = value
 
@@ -504,12 +618,23 @@ class TestCase:
     def failures(self):
         return self.__failure_list
 
+    @property
+    def response(self) -> Optional[Response]:
+        """ The response of the last run, None before it or if the transfer failed """
+        return self.__response
+
+    def release_response(self):
+        """ Drop the response of the last run, once it has been reported """
+        if self.__response is not None:
+            self.__response.close()
+            self.__response = None
+
     def realize_template(self, variable_name, context):
         if (context or self.templates) is None or (variable_name not in self.templates):
             return None
         if not context.get_values():
             return None
-        val = self.templates[variable_name].safe_substitute(context.get_values())
+        val = self.templates[variable_name].render(context)
         return val
 
     def parse(self, testcase_dict):
@@ -543,13 +668,15 @@ class TestCase:
             elif keyword == TestCaseKeywords.variable_binds:
                 self.__variable_binds_dict = Parser.flatten_dictionaries(value)
             elif keyword == TestCaseKeywords.generator_binds:
-                self.__generator_binds_dict = {str(k): str(v) for k, v in Parser.flatten_dictionaries(value)}
+                self.__generator_binds_dict = {str(k): str(v) for k, v in Parser.flatten_dictionaries(value).items()}
             elif keyword == TestCaseKeywords.options:
                 raise NotImplementedError("Yet to Support")
             elif keyword == TestCaseKeywords.body:
                 self.body = value
             elif keyword == TestCaseKeywords.absolute_urls:
                 self.__abs_url = Parser.safe_to_bool(value)
+            elif keyword == TestCaseKeywords.tags:
+                self.tags = value
 
         expected_status = testcase_dict.get(TestCaseKeywords.expected_status, [])
         if expected_status:
@@ -566,10 +693,10 @@ class TestCase:
                 context.bind_generator_next(key, value)
 
     def post_update(self, context):
-        if self.extract_binds:
+        if self.extract_binds and self.__response is not None:
             for key, value in self.extract_binds.items():
                 result = value.extract(
-                    body=self.body, headers=self.headers, context=context)
+                    body=self.__response.text, headers=self.__response.headers, context=context)
                 if result:
                     context.bind_variable(key, result)
 
@@ -578,17 +705,60 @@ class TestCase:
             return True
         return False
 
+    def template_variables(self) -> Optional[set]:
+        """ Names of the context variables this test reads, None if they can't be known before running it """
+        names = set()
+        if 'url' in self.templates:
+            names.update(self.templates['url'].variables)
+        for key, header in self.__header_dict.items():
+            if not isinstance(header, dict):
+                continue
+            template_list = header.values() if key == 'template' else [header.get('template')]
+            for template in template_list:
+                if template:
+                    names.update(compile_template(template).variables)
+
+        part_list = list(self.extract_binds.values()) + list(self.validators)
+        if isinstance(self.__body, ContentHandler):
+            part_list.append(self.__body)
+        for part in part_list:
+            if not hasattr(part, 'template_variables'):
+                return None
+            part_names = part.template_variables()
+            if part_names is None:
+                return None
+            names.update(part_names)
+        return names
+
     def render(self):
+        """ Render the body for this run, again on every run so generator binds reach it """
+        self.__rendered_body = None
         if self.is_dynamic() or self.__context is not None:
-            if isinstance(self.__body, ContentHandler):
-                self.__body = self.__body.get_content(self.__context)
+            if isinstance(self.__body, ContentHandler) and not self.__body.is_streamable():
+                self.__rendered_body = self.__body.get_content(self.__context)
+
+    @property
+    def is_streamed_body(self):
+        """ Is the request body an untemplated file, sent to curl straight from disk """
+        return isinstance(self.__body, ContentHandler) and self.__body.is_streamable()
+
+    def release_request_body(self):
+        """ Close the file a streamed request body was read from """
+        if self.__request_stream is not None:
+            self.__request_stream.close()
+            self.__request_stream = None
 
     def __perform_validation(self) -> List:
 
         failure_list = []
         for validator in self.validators:
             logger.debug("Running validator: %s" % validator.name)
-            validate_result = validator.validate(body=self.body, headers=self.headers, context=self.__context)
+            if getattr(validator, 'uses_timings', False):
+                validate_result = validator.validate(body=self.__response.text, headers=self.__response.headers,
+                                                     context=self.__context, timings=self.__timings)
+            else:
+                validate_result = validator.validate(
+                    body=self.__response.text, headers=self.__response.headers, context=self.__context)
             if not validate_result:
                 self.__passed = False
             if hasattr(validate_result, 'details'):
@@ -597,6 +767,29 @@ class TestCase:
         return failure_list
 
     def run(self, context=None, timeout=None, curl_handler=None):
+        """ Run the test synchronously
+            A curl handle supplied by the caller (e.g. from a CurlPool) is left open so its connection can be reused """
+
+        supplied_handler = curl_handler
+        curl_handler = self.prepare(context=context, timeout=timeout, curl_handler=curl_handler)
+
+        if self.__delay:
+            time.sleep(self.__delay)
+        error = None
+        try:
+            logger.info("Hitting %s" % self.url)
+            curl_handler.perform()
+        except pycurl.error as e:
+            logger.error("Unknown Exception", exc_info=True)
+            error = e
+        self.finalize(curl_handler, context=context, error=error)
+        if curl_handler is not supplied_handler:
+            curl_handler.close()
+
+    def prepare(self, context=None, timeout=None, curl_handler=None, pool=None):
+        """ Bind the context, render the test and return a curl handle configured for it
+            The transfer is not performed, so the handle can be driven by run() or by a CurlMulti.
+            Without a curl_handler one is taken from the pool, for the URL as rendered for this run """
 
         if context is None:
             context = self.__context
@@ -605,6 +798,8 @@ class TestCase:
         self.render()
         if timeout is None:
             timeout = DEFAULT_TIMEOUT
+        if curl_handler is None and pool is not None:
+            curl_handler = pool.acquire(self.url)
 
         if curl_handler:
 
@@ -619,7 +814,8 @@ class TestCase:
         else:
             curl_handler = pycurl.Curl()
 
-        body_byte, header_byte = self.__default_curl_config(curl_handler, timeout)
+        self.__response = None
+        self.__curl_buffers = self.__default_curl_config(curl_handler, timeout)
         if self.config.timeout:
             curl_handler.setopt(pycurl.CONNECTTIMEOUT, self.config.timeout)
 
@@ -627,7 +823,15 @@ class TestCase:
             curl_handler.setopt(pycurl.SSL_VERIFYPEER, 0)
             curl_handler.setopt(pycurl.SSL_VERIFYHOST, 0)
 
-        if self.body:
+        self.release_request_body()
+        if self.http_method == EnumHttpMethod.HEAD.name:
+            pass  # HEAD requests carry no body, don't open or read the file
+        elif self.is_streamed_body:
+            self.__request_stream = self.__body.open_stream(context)
+            logger.debug("Request body streamed from %s" % self.__request_stream.path)
+            curl_handler.setopt(pycurl.READFUNCTION, self.__request_stream.read)
+            curl_handler.setopt(pycurl.SEEKFUNCTION, self.__request_stream.seek)
+        elif self.body:
             logger.debug("Request body %s" % self.body)
             curl_handler.setopt(curl_handler.READFUNCTION, BytesIO(bytes(self.body, 'utf-8')).read)
 
@@ -637,68 +841,71 @@ class TestCase:
         self.__configure_curl_method(curl_handler)
 
         head = self.headers
-        self.__configure_curl_headers(curl_handler, head)
+        self.__configure_curl_headers(curl_handler, head, keep_alive=self.config.keep_alive)
+        return curl_handler
 
-        if self.__delay:
-            time.sleep(self.__delay)
-        try:
-            logger.info("Hitting %s" % self.url)
-            curl_handler.perform()
-        except pycurl.error as e:
-            logger.error("Unknown Exception", exc_info=True)
+    def finalize(self, curl_handler, context=None, error=None):
+        """ Process the outcome of a transfer configured by prepare()
+            error is the pycurl error (or an (errno, message) pair from CurlMulti) if the transfer failed.
+            The curl handle is left open, closing it is the caller's business """
+
+        if context is None:
+            context = self.__context
+        self.release_request_body()
+        body_byte, headers = self.__curl_buffers
+        self.__curl_buffers = None
+        self.__timings = Timings.from_curl(curl_handler)
+
+        if error is not None:
             self.__passed = False
-            curl_handler.close()
-            trace = traceback.format_exc()
+            if isinstance(error, pycurl.error):
+                trace = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+            else:
+                error = pycurl.error(*error)
+                trace = None
             self.__failure_list.append(
-                Failure(message="Curl Exception: {0}".format(e), details=trace, failure_type=FAILURE_CURL_EXCEPTION))
+                Failure(message="Curl Exception: {0}".format(error), details=trace,
+                        failure_type=FAILURE_CURL_EXCEPTION))
             return
-        self.body = body_byte.getvalue()
-        body_byte.close()
-        response_code = curl_handler.getinfo(pycurl.RESPONSE_CODE)
-        self.__response_code = int(response_code)
+        response = Response(int(curl_handler.getinfo(pycurl.RESPONSE_CODE)), headers=headers, content=body_byte)
+        self.__response = response
         if self.config.print_bodies:
-            print(self.body)
-        try:
-            response_headers = Parser.parse_headers(header_byte.getvalue())
-            self.__response_headers = response_headers
-            logger.debug("RESPONSE HEADERS: %s" % self.__response_headers)
-            header_byte.close()
-
-        except Exception as e:  # Need to catch the expected exception
-            trace = traceback.format_exc()
-            self.__failure_list.append(Failure(
-                message="Header parsing exception: {0}".format(e), details=trace, failure_type=FAILURE_TEST_EXCEPTION)
-            )
-            self.__passed = False
-            curl_handler.close()
-            return
+            print(response.text)
+        logger.debug("RESPONSE HEADERS: %s" % response.headers)
 
-        if self.__response_code in self.expected_http_status_code_list:
+        if response.status_code in self.expected_http_status_code_list:
             self.__passed = True
             self.__failure_list.extend(self.__perform_validation())
             self.post_update(context)
         else:
             self.__passed = False
             failure_message = "Invalid HTTP response code: response code {0} not in expected codes {1}".format(
-                self.__response_code, self.expected_http_status_code_list
+                response.status_code, self.expected_http_status_code_list
             )
             self.__failure_list.append(
                 Failure(message=failure_message, details=None, failure_type=FAILURE_INVALID_RESPONSE)
             )
-        curl_handler.close()
 
     @staticmethod
-    def __configure_curl_headers(curl_handler, head):
+    def __configure_curl_headers(curl_handler, head, keep_alive=True):
         if head.get('content-type'):
             content_type = head['content-type']
             head[u'content-type'] = '%s ; charset=UTF-8' % content_type
         headers = ["%s:%s" % (header_name, header_value) for header_name, header_value in head.items()]
         headers.append("Expect:")
-        headers.append("Connection: close")
+        if not keep_alive:
+            headers.append("Connection: close")
+            curl_handler.setopt(pycurl.FORBID_REUSE, 1)
         logger.debug("Request headers %s " % head)
         curl_handler.setopt(curl_handler.HTTPHEADER, headers)
 
     def __configure_curl_method(self, curl_handler):
+        if self.http_method == EnumHttpMethod.HEAD.name:  # Before the body is read, it is never sent
+            curl_handler.setopt(EnumHttpMethod.HEAD.value, 1)
+            return
+        if self.__request_stream is not None:
+            self.__configure_curl_streamed_method(curl_handler, self.__request_stream.size)
+            return
         body_length = len(self.body) if self.body else 0
         if self.http_method == EnumHttpMethod.POST.name:
             curl_handler.setopt(EnumHttpMethod.POST.value, 1)
@@ -718,21 +925,29 @@ class TestCase:
                 curl_handler.setopt(pycurl.POSTFIELDS, self.body)
                 curl_handler.setopt(pycurl.POSTFIELDSIZE, body_length)
 
-        elif self.http_method == EnumHttpMethod.HEAD.name:
-            curl_handler.setopt(pycurl.NOBODY, 1)
-            curl_handler.setopt(EnumHttpMethod.HEAD.value, EnumHttpMethod.HEAD.name)
         else:
             curl_handler.setopt(pycurl.CUSTOMREQUEST, self.http_method.upper())
             if self.body:
                 curl_handler.setopt(pycurl.POSTFIELDS, self.body)
                 curl_handler.setopt(pycurl.POSTFIELDSIZE, body_length)
 
+    def __configure_curl_streamed_method(self, curl_handler, body_length):
+        """ The body comes from the READFUNCTION, curl only needs the method and the size """
+        if self.http_method == EnumHttpMethod.PUT.name:
+            curl_handler.setopt(pycurl.UPLOAD, 1)
+            curl_handler.setopt(pycurl.INFILESIZE_LARGE, body_length)
+        else:
+            curl_handler.setopt(pycurl.POST, 1)
+            curl_handler.setopt(pycurl.POSTFIELDSIZE_LARGE, body_length)
+            if self.http_method != EnumHttpMethod.POST.name:
+                curl_handler.setopt(pycurl.CUSTOMREQUEST, self.http_method)
+
     def __default_curl_config(self, curl_handler, timeout):
         body_byte = BytesIO()
-        header_byte = BytesIO()
+        headers = ResponseHeaders()
         curl_handler.setopt(curl_handler.URL, str(self.url))
         curl_handler.setopt(curl_handler.TIMEOUT, timeout)
         curl_handler.setopt(pycurl.WRITEFUNCTION, body_byte.write)
-        curl_handler.setopt(pycurl.HEADERFUNCTION, header_byte.write)
+        curl_handler.setopt(pycurl.HEADERFUNCTION, headers.feed)
         curl_handler.setopt(pycurl.VERBOSE, self.__verbose)
-        return body_byte, header_byte
+        return body_byte, headers
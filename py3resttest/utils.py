@@ -1,15 +1,16 @@
 import logging
 import os
-import string
 import threading
-from email import message_from_string
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 from pathlib import Path
 from typing import Dict, Union, List, Any
 
-import yaml
 
 from py3resttest.generators import register_generator
+from py3resttest.plancache import PLAN_CACHE
+from py3resttest.response import ResponseHeaders
+from py3resttest.templating import compile_template
 from py3resttest.validators import register_test, register_comparator, register_extractor
 from py3resttest.validators import register_validator
 
@@ -37,10 +38,52 @@ class ChangeDir:
             ChangeDir.DIR_LOCK.release()
 
 
+class ResolvePaths:
+    """ Context manager resolving the relative file paths met while parsing against a directory
+
+        Unlike ChangeDir the working directory is left alone: the directory is only seen by resolve_path
+        calls of the same thread, so threads can parse files of different directories at once.
+    """
+    __state = threading.local()
+
+    def __init__(self, directory):
+        self.directory = str(Path(directory).resolve()) if directory else None
+
+    @classmethod
+    def current(cls):
+        """ Directory of the innermost ResolvePaths block of this thread, None outside of any """
+        stack = getattr(cls.__state, 'stack', None)
+        return stack[-1] if stack else None
+
+    def __enter__(self):
+        if not hasattr(self.__state, 'stack'):
+            self.__state.stack = []
+        self.__state.stack.append(self.directory or self.current())
+        return self
+
+    def __exit__(self, etype, value, traceback):
+        self.__state.stack.pop()
+
+
+def resolve_path(path) -> str:
+    """ Absolute version of a path, relative to the current ResolvePaths directory or else the working directory """
+    directory = ResolvePaths.current()
+    if directory:
+        return os.path.abspath(os.path.join(directory, path))
+    return os.path.abspath(path)
+
+
 def read_testcase_file(path):
-    with open(path, "r") as f:
-        testcase = yaml.safe_load(f.read())
-    return testcase
+    """ Parsed content of a test file, through the plan cache """
+    return PLAN_CACHE.load(path)
+
+
+def read_testcase_files(path_list, max_workers=8) -> List:
+    """ Parsed content of several test files, read and parsed concurrently, in the order given """
+    if len(path_list) < 2:
+        return [read_testcase_file(path) for path in path_list]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(path_list))) as executor:
+        return list(executor.map(read_testcase_file, path_list))
 
 
 class Parser:
@@ -63,7 +106,12 @@ class Parser:
             Catch: cannot accept unicode variable names, just values
             Returns a Unicode type output, if you want UTF-8 bytes, do encode_unicode_bytes on it
         """
-        return string.Template(templated_string).safe_substitute(variable_map)
+        return compile_template(templated_string).render(variable_map)
+
+    @staticmethod
+    def template_variables(templated_string) -> set:
+        """ Names of the variables a string.Template substitution of templated_string reads """
+        return set(compile_template(str(templated_string)).variables)
 
     @staticmethod
     def safe_to_json(in_obj):
@@ -162,23 +210,12 @@ class Parser:
 
     @staticmethod
     def parse_headers(header_string):
-        """ Parse a header-string into individual headers
-            Implementation based on: http://stackoverflow.com/a/5955949/95122
+        """ Parse a header-string into individual headers, see ResponseHeaders
             Note that headers are a list of (key, value) since duplicate headers are allowed
             NEW NOTE: keys & values are unicode strings, but can only contain ISO-8859-1 characters
         """
-        if isinstance(header_string, bytes):
-            header_string = header_string.decode()
-        # First line is request line, strip it out
-        if not header_string:
-            return list()
-        request, headers = header_string.split('\r\n', 1)
-        if not headers:
-            return list()
-
-        header_msg = message_from_string(headers)
         # Note: HTTP headers are *case-insensitive* per RFC 2616
-        return [(k.lower(), v) for k, v in header_msg.items()]
+        return ResponseHeaders.parse(header_string).items()
 
 def register_extensions(modules):
     """ Import the modules and register their respective extensions """
@@ -1,18 +1,49 @@
-import json
+import importlib
 import logging
 import os
-import string
+import re
+import threading
 import traceback
 from abc import abstractmethod, ABCMeta
+from functools import lru_cache
 from typing import Dict, List, Union, Optional
 
-from py3resttest.constants import COMPARATORS, FAILURE_EXTRACTOR_EXCEPTION, FAILURE_VALIDATOR_FAILED, VALIDATOR_TESTS
+from py3resttest.constants import (
+    COMPARATORS, FAILURE_EXTRACTOR_EXCEPTION, FAILURE_VALIDATOR_EXCEPTION, FAILURE_VALIDATOR_FAILED,
+    VALIDATOR_TESTS, compile_regex, regex_compare
+)
+from py3resttest.response import parse_json_body
+from py3resttest.stats import Timings
+from py3resttest.templating import compile_template
 
 logger = logging.getLogger('py3resttest.validators')
 
 EXTRACTORS = {}
 VALIDATORS = {}
 
+# Extensions shipped with py3resttest, registered the first time the registries are used
+BUILTIN_EXTENSIONS = ('py3resttest.ext.validator_jsonschema', 'py3resttest.ext.extractor_jmespath')
+_builtin_extensions_lock = threading.Lock()
+_builtin_extensions_loaded = False
+
+
+def load_builtin_extensions():
+    """ Register the extractors and validators of BUILTIN_EXTENSIONS, names registered before keep their parser
+        Done on first lookup rather than on import, so importing the package stays cheap """
+    global _builtin_extensions_loaded
+    if _builtin_extensions_loaded:
+        return
+    with _builtin_extensions_lock:
+        if _builtin_extensions_loaded:
+            return
+        for module_name in BUILTIN_EXTENSIONS:
+            module = importlib.import_module(module_name)
+            for name, parse_function in getattr(module, 'VALIDATORS', {}).items():
+                VALIDATORS.setdefault(name.lower(), parse_function)
+            for name, parse_function in getattr(module, 'EXTRACTORS', {}).items():
+                EXTRACTORS.setdefault(name, parse_function)
+        _builtin_extensions_loaded = True
+
 
 class Failure:
 
@@ -69,11 +100,17 @@ class AbstractExtractor(metaclass=ABCMeta):
 
     def templated_query(self, context=None):
         if context and self.is_templated:
-            query = string.Template(self.query).safe_substitute(
-                context.get_values())
+            query = compile_template(self.query).render(context)
             return query
         return self.query
 
+    def template_variables(self):
+        """ Names of the context variables the templated query reads """
+        if not self.is_templated:
+            return set()
+        from py3resttest.utils import Parser
+        return Parser.template_variables(self.query)
+
     def get_readable_config(self, context=None):
         """ Print a human-readable version of the configuration """
         query = self.templated_query(context=context)
@@ -106,6 +143,37 @@ class AbstractExtractor(metaclass=ABCMeta):
         return extractor_base
 
 
+class CompiledQuery:
+    """ A jsonpath_mini query split once into the chain of keys and array indexes it walks """
+
+    def __init__(self, query: str, delimiter='.'):
+        self.query = query
+        self.path = []
+        stripped_query = query.strip(delimiter)
+        if stripped_query:
+            for x in stripped_query.split(delimiter):
+                try:
+                    self.path.append(int(x))
+                except ValueError:
+                    self.path.append(x)
+        self.path = tuple(self.path)
+
+    def __call__(self, dictionary: Union[List, Dict]):
+        """ The value at the end of the path, None if the document doesn't have it """
+        try:
+            for key in self.path:
+                dictionary = dictionary[key]
+        except Exception:
+            return None
+        return dictionary
+
+
+@lru_cache(maxsize=1024)
+def compile_query(query: str, delimiter='.') -> CompiledQuery:
+    """ Compiled jsonpath_mini query, templated queries are cached by their rendered text """
+    return CompiledQuery(query, delimiter)
+
+
 class MiniJsonExtractor(AbstractExtractor):
     """ Extractor that uses jsonpath_mini syntax
         IE key.key or array_index.key extraction
@@ -115,36 +183,33 @@ class MiniJsonExtractor(AbstractExtractor):
         super(MiniJsonExtractor, self).__init__()
         self.extractor_type = 'jsonpath_mini'
         self._is_body_extractor = True
+        self.compiled_query = None  # Untemplated queries are compiled at parse time
 
     def extract_internal(self, query=None, args=None, body=None, headers=None):
 
-        if isinstance(body, bytes):
-            body = body.decode()
         try:
-            body = json.loads(body)
-            return self.query_dictionary(query, body)
+            body = parse_json_body(body)
         except ValueError:
             raise ValueError("Not legal JSON!")
+        if self.compiled_query is not None and query == self.compiled_query.query:
+            return self.compiled_query(body)
+        return self.query_dictionary(query, body)
 
     @staticmethod
     def query_dictionary(query: str, dictionary: Union[List, Dict], delimiter='.') -> Optional[Dict]:
         """ Do an xpath-like query with dictionary, using a template if relevant """
         try:
-            stripped_query = query.strip(delimiter)
-            if stripped_query:
-                for x in stripped_query.split(delimiter):
-                    try:
-                        dictionary = dictionary[int(x)]
-                    except ValueError:
-                        dictionary = dictionary[x]
+            compiled_query = compile_query(query, delimiter)
         except Exception:
             return None
-        return dictionary
+        return compiled_query(dictionary)
 
     @classmethod
     def parse(cls, config):
-        base = MiniJsonExtractor()
-        return cls.configure_base(config, base)
+        base = cls.configure_base(config, MiniJsonExtractor())
+        if not base.is_templated:
+            base.compiled_query = compile_query(base.query)
+        return base
 
 
 class HeaderExtractor(AbstractExtractor):
@@ -158,7 +223,10 @@ class HeaderExtractor(AbstractExtractor):
     def extract_internal(self, query=None, args=None, body=None, headers=None):
         low = query.lower()
         # Value for all matching key names
-        extracted = [y[1] for y in filter(lambda x: x[0] == low, headers)]
+        if hasattr(headers, 'get_all'):
+            extracted = headers.get_all(low)
+        else:
+            extracted = [y[1] for y in filter(lambda x: x[0] == low, headers)]
         if len(extracted) == 0:
             raise ValueError("Invalid header name {0}".format(query))
         # Fix #19
@@ -194,6 +262,7 @@ class RawBodyExtractor(AbstractExtractor):
 def _get_extractor(config_dict):
     """ Utility function, get an extract function for a single valid extractor name in config
         and error if more than one or none """
+    load_builtin_extensions()
     for key, value in config_dict.items():
         if key in EXTRACTORS:
             return parse_extractor(key, value)
@@ -217,6 +286,20 @@ class AbstractValidator(metaclass=ABCMeta):
     def validate(self, body=None, headers=None, context=None):
         """ Run the validation function, return true or a Failure """
 
+    def template_variables(self):
+        """ Names of the context variables validation reads, None if they can't be known before running """
+        from py3resttest.utils import Parser
+        names = set()
+        if self.is_template_expected:
+            names.update(Parser.template_variables(self.expected))
+        for part in vars(self).values():
+            if hasattr(part, 'template_variables'):  # Extractors and content handlers
+                part_names = part.template_variables()
+                if part_names is None:
+                    return None
+                names.update(part_names)
+        return names
+
 
 class ComparatorValidator(AbstractValidator):
     """ Does extract and compare from request body   """
@@ -224,6 +307,8 @@ class ComparatorValidator(AbstractValidator):
     def __init__(self):
         super(ComparatorValidator, self).__init__()
         self.name = 'ComparatorValidator'
+        self.compiled_pattern = None  # Static pattern of a regex comparator, compiled at parse time
+        self.max_length = None  # Longest text a regex comparator searches, only limited when a test asks for it
 
     def get_readable_config(self, context=None):
         """ Get a human-readable config string """
@@ -252,15 +337,23 @@ class ComparatorValidator(AbstractValidator):
                 return Failure(message="Expected value extractor threw exception", details=trace, validator=self,
                                failure_type=FAILURE_EXTRACTOR_EXCEPTION)
         elif self.is_template_expected and context:
-            expected_val = string.Template(
-                self.expected).safe_substitute(context.get_values())
+            expected_val = compile_template(self.expected).render(context)
         else:
             expected_val = self.expected
 
         # Handle a bytes-based body and a unicode expected value seamlessly
         if isinstance(extracted_val, bytes) and isinstance(expected_val, str):
             expected_val = expected_val.encode('utf-8')
-        comparison = self.comparator(extracted_val, expected_val)
+        if self.comparator_name == 'regex':
+            pattern = self.compiled_pattern if self.compiled_pattern is not None else str(expected_val)
+            try:
+                comparison = regex_compare(str(extracted_val), pattern, max_length=self.max_length)
+            except (ValueError, re.error) as e:
+                return Failure(message="Regex comparison failed: {0}".format(e), validator=self,
+                               details=self.get_readable_config(context=context),
+                               failure_type=FAILURE_VALIDATOR_EXCEPTION)
+        else:
+            comparison = self.comparator(extracted_val, expected_val)
 
         if not comparison:
             failure = Failure(validator=self)
@@ -337,6 +430,15 @@ class ComparatorValidator(AbstractValidator):
                     raise ValueError(
                         "Can't supply a non-template, non-extract dictionary to comparator-validator")
 
+        if output.comparator_name == 'regex':
+            if 'max_length' in config:
+                output.max_length = int(config['max_length']) if config['max_length'] else None
+            if not output.is_template_expected and not isinstance(output.expected, AbstractExtractor):
+                try:
+                    output.compiled_pattern = compile_regex(str(output.expected))
+                except re.error as e:
+                    raise ValueError("Invalid regex {0}: {1}".format(output.expected, e))
+
         return output
 
 
@@ -388,6 +490,77 @@ class ExtractTestValidator(AbstractValidator):
         return failure
 
 
+class TimingValidator(AbstractValidator):
+    """ Compares a curl timing metric of the request just made against an expected value
+        Syntax sample:
+          { metric: 'total_time', comparator: 'lt', expected: 0.2 }
+    """
+    uses_timings = True  # validate() gets the response.Timings of the transfer
+
+    def __init__(self):
+        super(TimingValidator, self).__init__()
+        self.name = 'TimingValidator'
+        self.metric = None
+
+    def get_readable_config(self, context=None):
+        """ Get a human-readable config string """
+        return "Timing metric: {0}, comparator: {1}, expected: {2}".format(
+            self.metric, self.comparator_name, self.expected)
+
+    @staticmethod
+    def parse(config):
+        from py3resttest.utils import Parser
+        output = TimingValidator()
+        config = Parser.lowercase_keys(Parser.flatten_dictionaries(config))
+        output.config = config
+
+        output.metric = str(config.get('metric', 'total_time')).lower()
+        if output.metric not in Timings.METRICS:
+            raise ValueError("Invalid timing metric %s, available metrics are %s" % (
+                output.metric, ', '.join(Timings.METRICS)))
+
+        output.comparator_name = str(config.get('comparator', 'lt')).lower()
+        try:
+            output.comparator = COMPARATORS[output.comparator_name]
+        except KeyError:
+            raise ValueError("Invalid comparator given! %s  "
+                             "available options are %s" % (output.comparator_name, COMPARATORS.keys()))
+
+        try:
+            expected = config['expected']
+        except KeyError:
+            raise ValueError("No expected value found in timing validator config, one must be!")
+        if isinstance(expected, dict) and isinstance(expected.get('template'), str):
+            output.is_template_expected = True
+            output.expected = expected['template']
+        elif isinstance(expected, (int, float)) and not isinstance(expected, bool):
+            output.expected = expected
+        else:
+            raise ValueError("Timing validator expected value must be a number or a {template: 'string'}")
+        return output
+
+    def validate(self, body=None, headers=None, context=None, timings=None):
+        if timings is None:
+            return Failure(message="No curl timings recorded for timing validation", validator=self,
+                           details=self.get_readable_config(context=context),
+                           failure_type=FAILURE_VALIDATOR_EXCEPTION)
+        expected_val = self.expected
+        if self.is_template_expected:
+            try:
+                expected_val = float(compile_template(self.expected).render(context))
+            except ValueError as e:
+                return Failure(message="Templated timing expectation is not a number: {0}".format(e),
+                               validator=self, details=self.get_readable_config(context=context),
+                               failure_type=FAILURE_VALIDATOR_EXCEPTION)
+
+        actual_val = timings.get(self.metric)
+        if self.comparator(actual_val, expected_val):
+            return True
+        return Failure(message="Timing failed, evaluating {0}({1}={2}, {3}) returned False".format(
+            self.comparator_name, self.metric, actual_val, expected_val), validator=self,
+            details=self.get_readable_config(context=context), failure_type=FAILURE_VALIDATOR_FAILED)
+
+
 def parse_extractor(extractor_type, config):
     """ Convert extractor type and config to an extractor instance
         Uses registered parse function for that extractor type
@@ -395,6 +568,7 @@ def parse_extractor(extractor_type, config):
             - An extraction function (wrapped in an Extractor instance with configs and returned)
             - OR a a full Extractor instance (configured)
     """
+    load_builtin_extensions()
     parse = EXTRACTORS.get(extractor_type.lower())
     if not parse:
         raise ValueError(
@@ -415,6 +589,7 @@ def parse_extractor(extractor_type, config):
 
 def parse_validator(name, config_node):
     '''Parse a validator from configuration and use it '''
+    load_builtin_extensions()
     name = name.lower()
     if name not in VALIDATORS:
         raise ValueError(
@@ -460,6 +635,9 @@ def register_extractor(extractor_name, parse_function):
     if extractor_name.lower() == 'expected':
         raise ValueError(
             "Cannot register extractors called 'expected', that is a reserved name")
+    if extractor_name.lower() == 'max_length':
+        raise ValueError(
+            "Cannot register extractors called 'max_length', that is a reserved name")
     if extractor_name in EXTRACTORS:
         raise ValueError(
             "Cannot register an extractor name that already exists: {0}".format(extractor_name))
@@ -495,3 +673,4 @@ register_validator('compare', ComparatorValidator.parse)
 register_validator('assertEqual', ComparatorValidator.parse)
 register_validator('extract_test', ExtractTestValidator.parse)
 register_validator('assertTrue', ExtractTestValidator.parse)
+register_validator('timing', TimingValidator.parse)
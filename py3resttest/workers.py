@@ -0,0 +1,118 @@
+import logging
+import multiprocessing
+import os
+import sys
+from typing import Callable, Dict, List, Optional
+
+from py3resttest.engine import CurlMultiEngine
+from py3resttest.pool import CurlPool
+from py3resttest.reporters import TestOutcome
+from py3resttest.stats import ConnectionStats
+from py3resttest.testcase import TestSet
+from py3resttest.utils import read_testcase_file, register_extensions
+
+"""
+Sharding of test groups across worker processes, so response validation isn't bound to a single CPU
+"""
+
+logger = logging.getLogger('py3resttest')
+
+
+class ShardResult:
+    """ What a worker returns: (group name, TestOutcome) pairs in completion order and its connection stats """
+
+    def __init__(self):
+        self.outcomes = []
+        self.stats = ConnectionStats()
+
+
+def shard_groups(test_group_list_dict: Dict, workers: int) -> List[List[str]]:
+    """ Split the group names into at most `workers` shards with about the same number of test cases each """
+    shards = [[] for _ in range(workers)]
+    sizes = [0] * workers
+    groups = sorted(test_group_list_dict.items(), key=lambda item: len(item[1].testcase_list), reverse=True)
+    for group_name, group_object in groups:
+        if not group_object.testcase_list:
+            continue
+        smallest = sizes.index(min(sizes))
+        shards[smallest].append(group_name)
+        sizes[smallest] += len(group_object.testcase_list)
+    return [shard for shard in shards if shard]
+
+
+def run_shard(base_url: str, test_file: str, group_names: List[str], concurrency=1, ordered=False,
+              extensions=None, log_level=logging.ERROR, selector=None) -> ShardResult:
+    """ Worker entry point: parse the test file afresh and run the test cases of the given groups
+
+        Parsing in the worker gives each group its own Context and generators, none of which could be
+        sent over from the parent anyway.
+    """
+    logger.setLevel(log_level)
+    if extensions is not None:
+        working_folder = os.path.realpath(os.path.abspath(os.getcwd()))
+        if working_folder not in sys.path:
+            sys.path.insert(0, working_folder)
+        register_extensions(extensions)
+
+    testcase_set = TestSet()
+    testcase_set.parse(base_url, testcase_list=read_testcase_file(test_file),
+                       working_directory=os.path.dirname(test_file), selector=selector)
+    group_dict = {
+        group_name: group_object for group_name, group_object in testcase_set.test_group_list_dict.items()
+        if group_name in group_names
+    }
+
+    result = ShardResult()
+
+    def on_complete(group_name, testcase):
+        result.outcomes.append((group_name, TestOutcome.from_testcase(testcase)))
+        testcase.release_response()
+
+    pool = CurlPool()
+    engine = CurlMultiEngine(concurrency=concurrency, pool=pool, ordered=ordered)
+    try:
+        engine.run(group_dict, callback=on_complete)
+    finally:
+        pool.close()
+    result.stats = pool.stats
+    return result
+
+
+def _run_shard_args(args) -> ShardResult:
+    return run_shard(*args)
+
+
+class WorkerPool:
+    """ Runs the groups of a test file on `workers` processes, reporting each test case as it is merged back
+
+        Workers are spawned rather than forked and each runs a single shard,
+        so they never see the parsed test set of the parent or of another shard.
+    """
+
+    def __init__(self, workers, concurrency=1, ordered=False, extensions=None, selector=None):
+        if int(workers) < 1:
+            raise ValueError("Workers must be a positive number, not %s" % workers)
+        self.workers = int(workers)
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.extensions = extensions
+        self.selector = selector  # Workers must build the same selection of tests as the parent
+        self.stats = ConnectionStats()
+
+    def run(self, base_url: str, test_file: str, test_group_list_dict: Dict, callback: Optional[Callable] = None):
+        """ Run the groups, calling callback(group_name, TestOutcome) for each test case as its shard finishes """
+        shards = shard_groups(test_group_list_dict, self.workers)
+        if not shards:
+            return
+        shard_args = [
+            (base_url, str(test_file), group_names, self.concurrency, self.ordered, self.extensions, logger.level,
+             self.selector)
+            for group_names in shards
+        ]
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(processes=len(shards), maxtasksperchild=1) as process_pool:
+            for result in process_pool.imap_unordered(_run_shard_args, shard_args):
+                self.stats.merge(result.stats)
+                for group_name, outcome in result.outcomes:
+                    if callback:
+                        callback(group_name, outcome)
@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.received = []  # (path, body) of every request, in arrival order
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """ Answers every request with a JSON description of it, `?sleep=seconds` slows the answer down
+        and `?trailer=value` sends it chunked, followed by an X-Checksum trailer """
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, send_body=True):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        request_body = self.rfile.read(length).decode('utf-8') if length else ''
+        self.server.received.append((parsed.path, request_body))
+        if 'sleep' in query:
+            time.sleep(float(query['sleep'][0]))
+        status = int(query.get('status', ['200'])[0])
+        payload = json.dumps({
+            'method': self.command, 'path': parsed.path, 'body': request_body,
+            'headers': {k.lower(): v for k, v in self.headers.items()}
+        }).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-Path', parsed.path)
+        if 'trailer' in query:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('Trailer', 'X-Checksum')
+            self.end_headers()
+            self.wfile.write(b'%x\r\n%s\r\n0\r\nX-Checksum: %s\r\n\r\n' % (
+                len(payload), payload, query['trailer'][0].encode('utf-8')))
+            return
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+    def do_HEAD(self):
+        self._reply(send_body=False)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """ Serves EchoHandler on a random local port for the duration of a `with` block """
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), EchoHandler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%s' % self.httpd.server_address[1]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
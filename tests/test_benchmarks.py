@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from local_server import LocalServer
+from py3resttest.benchmarks import (
+    Benchmark, BenchmarkResult, metrics_to_tuples, write_benchmark_csv, write_benchmark_json, write_benchmark_result
+)
+from py3resttest.binding import Context
+from py3resttest.generators import factory_generate_ids
+from py3resttest.testcase import TestSet
+
+
+class BenchmarkParseTest(unittest.TestCase):
+
+    def test_parse(self):
+        benchmark = Benchmark('http://localhost')
+        benchmark.parse([
+            {'name': 'Basic get'},
+            {'url': '/api/person/'},
+            {'warmup_runs': 7},
+            {'benchmark_runs': '101'},
+            {'output_file': 'miniapp-benchmark.csv'},
+            {'metrics': ['total_time', {'total_time': 'mean'}, {'total_time': 'median'}, 'size_download',
+                         {'speed_download': 'median'}]}
+        ])
+        self.assertEqual('Basic get', benchmark.name)
+        self.assertEqual(7, benchmark.warmup_runs)
+        self.assertEqual(101, benchmark.benchmark_runs)
+        self.assertEqual('csv', benchmark.output_format)
+        self.assertEqual('miniapp-benchmark.csv', benchmark.output_file)
+        self.assertEqual({'total_time', 'size_download'}, benchmark.raw_metrics)
+        self.assertEqual({'total_time': ['mean', 'median'], 'speed_download': ['median']},
+                         benchmark.aggregated_metrics)
+
+    def test_parse_metrics_mapping(self):
+        benchmark = Benchmark()
+        benchmark.parse({'metrics': {'speed_upload': 'median', 'redirect_time': ['mean', 'total']},
+                         'output_format': 'JSON'})
+        self.assertEqual('json', benchmark.output_format)
+        self.assertEqual(set(), benchmark.raw_metrics)
+        self.assertEqual({'speed_upload': ['median'], 'redirect_time': ['mean', 'total']},
+                         benchmark.aggregated_metrics)
+
+    def test_parse_invalid(self):
+        self.assertRaises(ValueError, Benchmark().parse, {'metrics': ['nonsense_time']})
+        self.assertRaises(ValueError, Benchmark().parse, {'metrics': [{'total_time': 'nonsense'}]})
+        self.assertRaises(ValueError, Benchmark().parse, {'output_format': 'xml'})
+        self.assertRaises(TypeError, Benchmark().parse, {'metrics': 5})
+
+    def test_testset_benchmark(self):
+        ts = TestSet()
+        ts.parse('http://localhost', [
+            {'benchmark': [{'name': 'bench'}, {'url': '/api/'}, {'group': 'perf'}, {'metrics': ['total_time']}]}
+        ])
+        group = ts.test_group_list_dict['perf']
+        self.assertEqual([], group.testcase_list)
+        self.assertEqual(1, len(group.benchmark_list))
+        self.assertEqual('http://localhost/api/', group.benchmark_list[0].url)
+
+
+class BenchmarkOutputTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.result = BenchmarkResult(name='bench', group='perf')
+        self.result.failures = 1
+        self.result.results = {'total_time': [0.1, 0.2], 'size_download': [10, 10]}
+        self.result.aggregates = [('total_time', 'mean', 0.15)]
+
+    def test_metrics_to_tuples(self):
+        self.assertEqual([('size_download', 'total_time'), (10, 0.1), (10, 0.2)],
+                         metrics_to_tuples(self.result.results))
+
+    def test_write_csv(self):
+        out = io.StringIO()
+        write_benchmark_csv(out, self.result)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(['Benchmark', 'bench'], rows[0])
+        self.assertEqual(['Failures', '1'], rows[2])
+        self.assertEqual(['total_time', 'mean', '0.15'], rows[4])
+        self.assertEqual(['size_download', 'total_time'], rows[6])
+        self.assertEqual(['10', '0.2'], rows[8])
+
+    def test_write_json(self):
+        out = io.StringIO()
+        write_benchmark_json(out, self.result)
+        data = json.loads(out.getvalue())
+        self.assertEqual('bench', data['name'])
+        self.assertEqual(1, data['failures'])
+        self.assertEqual([0.1, 0.2], data['results']['total_time'])
+        self.assertEqual([['total_time', 'mean', 0.15]], data['aggregates'])
+
+
+class BenchmarkRunTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = LocalServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__()
+
+    def test_run(self):
+        benchmark = Benchmark(self.server.url)
+        benchmark.parse({'name': 'get', 'url': '/item', 'warmup_runs': 2, 'benchmark_runs': 5,
+                         'metrics': ['size_download', {'total_time': ['mean', 'median', 'total']}]})
+        result = benchmark.run()
+        self.assertEqual(0, result.failures)
+        self.assertEqual(['size_download'], list(result.results))
+        self.assertEqual(5, len(result.results['size_download']))
+        self.assertTrue(all(size > 0 for size in result.results['size_download']))
+        self.assertEqual(['mean', 'median', 'total'], [aggregate for _, aggregate, _ in result.aggregates])
+        self.assertTrue(all(value > 0 for _, _, value in result.aggregates))
+
+    def test_run_failures(self):
+        benchmark = Benchmark('http://127.0.0.1:1')
+        benchmark.parse({'url': '/', 'warmup_runs': 0, 'benchmark_runs': 3, 'metrics': [{'total_time': 'mean'}]})
+        result = benchmark.run(timeout=2)
+        self.assertEqual(3, result.failures)
+        self.assertEqual([('total_time', 'mean', None)], result.aggregates)
+
+    def test_run_unexpected_status(self):
+        benchmark = Benchmark(self.server.url)
+        benchmark.parse({'url': '/item?status=500', 'warmup_runs': 0, 'benchmark_runs': 3,
+                         'metrics': ['size_download']})
+        result = benchmark.run()
+        self.assertEqual(3, result.failures)
+        self.assertEqual([], result.results['size_download'])
+
+        benchmark = Benchmark(self.server.url)
+        benchmark.parse({'url': '/item?status=500', 'benchmark_runs': 2, 'expected_status': [500],
+                         'metrics': ['size_download']})
+        self.assertEqual(0, benchmark.run().failures)
+
+    def test_run_generated_body(self):
+        context = Context()
+        context.add_generator('ids', factory_generate_ids(10)())
+        benchmark = Benchmark(self.server.url, context=context)
+        benchmark.parse({'url': {'template': '/p/$id'}, 'method': 'POST', 'body': {'template': '{"id": "$id"}'},
+                         'generator_binds': {'id': 'ids'}, 'warmup_runs': 0, 'benchmark_runs': 3,
+                         'metrics': ['total_time']})
+        self.assertEqual(0, benchmark.run().failures)
+        self.assertEqual([('/p/10', '{"id": "10"}'), ('/p/11', '{"id": "11"}'), ('/p/12', '{"id": "12"}')],
+                         self.server.httpd.received)
+
+    def test_write_result(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, 'out.json')
+            benchmark = Benchmark(self.server.url)
+            benchmark.parse({'url': '/', 'warmup_runs': 0, 'benchmark_runs': 2, 'output_format': 'json',
+                             'output_file': output_file, 'metrics': ['total_time']})
+            write_benchmark_result(benchmark, benchmark.run())
+            with open(output_file) as f:
+                self.assertEqual(2, len(json.load(f)['results']['total_time']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,6 +32,17 @@ class BindingTest(unittest.TestCase):
         self.assertEqual('bar2', context.get_value('foo'))
         self.assertEqual(2, context.mod_count)
 
+    def test_variable_versions(self):
+        context = Context()
+        self.assertEqual((None,), context.get_versions(['foo']))
+        context.bind_variable('foo', 'bar')
+        context.bind_variable('other', 'value')
+        self.assertEqual((1, 2, None), context.get_versions(['foo', 'other', 'missing']))
+        context.bind_variable('foo', 'bar')  # Unchanged value keeps the version
+        self.assertEqual((1,), context.get_versions(['foo']))
+        context.bind_variable('foo', 'baz')
+        self.assertEqual((3,), context.get_versions(['foo']))
+
     def test_generator(self):
         """ Test adding a generator """
         context = Context()
@@ -2,10 +2,11 @@
 import json
 import os
 import string
+import tempfile
 import unittest
 
 from py3resttest.binding import Context
-from py3resttest.contenthandling import ContentHandler
+from py3resttest.contenthandling import ContentHandler, FileContentCache, FileStream
 
 
 class ContentHandlerTest(unittest.TestCase):
@@ -216,5 +217,99 @@ class ContentHandlerTest(unittest.TestCase):
                 pass
 
 
+class FileContentCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _write(self, name, content, mtime_offset=0):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime_offset:
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset))
+        return path
+
+    def test_read_cached(self):
+        cache = FileContentCache()
+        path = self._write('a.json', '{"a": 1}')
+        self.assertEqual('{"a": 1}', cache.read(path))
+        self.assertIs(cache.read(path), cache.read(path))
+        self.assertEqual((2, 1), (cache.hits, cache.misses))
+
+    def test_mtime_invalidation(self):
+        cache = FileContentCache()
+        path = self._write('a.json', '{"a": 1}')
+        cache.read(path)
+        self._write('a.json', '{"a": 2}', mtime_offset=10 ** 9)
+        self.assertEqual('{"a": 2}', cache.read(path))
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(8, cache.size)
+
+    def test_eviction(self):
+        cache = FileContentCache(max_bytes=10)
+        first = self._write('first', '12345')
+        second = self._write('second', '12345')
+        third = self._write('third', '12345')
+        too_big = self._write('big', '12345678901')
+        cache.read(first)
+        cache.read(second)
+        cache.read(first)  # Most recently used now
+        cache.read(third)  # Evicts second
+        self.assertEqual(10, cache.size)
+        cache.read(first)
+        self.assertEqual(2, cache.hits)
+        cache.read(second)
+        self.assertEqual(4, cache.misses)
+        self.assertEqual('12345678901', cache.read(too_big))
+        self.assertEqual(10, cache.size)
+
+
+class FileStreamTest(unittest.TestCase):
+
+    def test_read_and_seek(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b'0123456789')
+        try:
+            stream = FileStream(f.name)
+            self.assertEqual(10, stream.size)
+            self.assertEqual(b'0123', stream.read(4))
+            self.assertEqual(b'456789', stream.read(100))
+            self.assertEqual(b'', stream.read(100))
+            self.assertEqual(0, stream.seek(2, os.SEEK_SET))
+            self.assertEqual(b'23', stream.read(2))
+            self.assertEqual(0, stream.seek(-1, os.SEEK_END))
+            self.assertEqual(b'9', stream.read(4))
+            self.assertEqual(1, stream.seek(11, os.SEEK_SET))
+            stream.close()
+        finally:
+            os.unlink(f.name)
+
+    def test_empty_file(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            pass
+        try:
+            stream = FileStream(f.name)
+            self.assertEqual(0, stream.size)
+            self.assertEqual(b'', stream.read(10))
+            stream.close()
+        finally:
+            os.unlink(f.name)
+
+    def test_open_stream(self):
+        handler = ContentHandler.parse_content({'template': {'file': {'template': '/tmp/$name'}}})
+        self.assertFalse(handler.is_streamable())
+        self.assertRaises(ValueError, handler.open_stream)
+        handler = ContentHandler.parse_content({'file': {'template': '/tmp/$name.json'}})
+        self.assertTrue(handler.is_streamable())
+        context = Context()
+        context.bind_variable('name', 'body')
+        self.assertEqual('/tmp/body.json', handler.get_path(context))
+
+
 if __name__ == '__main__':
     unittest.main()
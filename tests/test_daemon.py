@@ -0,0 +1,120 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+import yaml
+
+from local_server import LocalServer
+from py3resttest.daemon import RUN_OPTIONS, RunClient, RunServer, is_serving, receive, send
+from py3resttest.plancache import PlanCache
+from py3resttest.runner import ArgsRunner, Runner
+
+
+class DaemonTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = LocalServer().__enter__()
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, 'py3resttest.sock')
+        self.run_server = RunServer(self.socket_path)
+        self.thread = threading.Thread(target=self.run_server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.test_file = os.path.join(self.directory.name, 'test.yaml')
+        with open(self.test_file, 'w') as f:
+            yaml.safe_dump([
+                {'test': [{'name': 'a1'}, {'url': '/a1'}, {'group': 'a'}]},
+                {'test': [{'name': 'a2'}, {'url': '/a2?status=500'}, {'group': 'a'}]},
+                {'test': [{'name': 'b1'}, {'url': '/b1'}, {'group': 'b'}]},
+            ], f)
+
+    def tearDown(self) -> None:
+        self.run_server.shutdown()
+        self.run_server.server_close()
+        self.directory.cleanup()
+        self.server.__exit__()
+
+    def _run(self, *argv):
+        args = ArgsRunner()
+        args.args(['--url', self.server.url, '--connect', self.socket_path] + list(argv))
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = RunClient(args.connect).run(args, Runner(args))
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_run(self):
+        self.assertTrue(is_serving(self.socket_path))
+        jsonl = os.path.join(self.directory.name, 'results.jsonl')
+        code, output, _ = self._run('--test', self.test_file, '--jsonl', jsonl, '--concurrency', '2')
+        self.assertEqual(0, code)
+        self.assertIn('Total Test to run: 3', output)
+        self.assertIn('Case Name: a2', output)
+        self.assertIn('Invalid HTTP response code', output)
+        self.assertIn('Total testcase success: 1', output)
+        self.assertIn('SLOWEST TESTS', output)
+        self.assertIn('Requests: 3', output)
+        with open(jsonl) as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual({'a1', 'a2', 'b1'}, {result['name'] for result in results})
+        self.assertIsNotNone(results[0]['timings'])
+
+        code, output, _ = self._run('--test', self.test_file, '--group', 'b')  # Warm pool, new selection
+        self.assertEqual(0, code)
+        self.assertIn('Total Test to run: 1', output)
+        self.assertIn('Requests: 1, new connections: 0, reused connections: 1', output)
+
+    def test_benchmark_output_relative_to_client(self):
+        client_directory = os.path.join(self.directory.name, 'client')
+        os.mkdir(client_directory)
+        with open(self.test_file, 'w') as f:
+            yaml.safe_dump([{'benchmark': [{'url': '/bench'}, {'warmup_runs': 0}, {'benchmark_runs': 1},
+                                           {'metrics': ['total_time']}, {'output_file': 'bench.csv'}]}], f)
+        args = ArgsRunner()
+        args.args(['--url', self.server.url, '--test', self.test_file])
+        options = {option: getattr(args, option) for option in RUN_OPTIONS}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(self.socket_path)
+            with connection.makefile('rwb') as stream:
+                send(stream, 'run', options=options, cwd=client_directory)  # Not the cwd of the serving process
+                events = list(receive(stream))
+        self.assertEqual('finish', events[-1]['event'])
+        self.assertTrue(os.path.exists(os.path.join(client_directory, 'bench.csv')))
+        self.assertFalse(os.path.exists('bench.csv'))
+
+    def test_error(self):
+        code, _, error = self._run('--test', os.path.join(self.directory.name, 'missing.yaml'))
+        self.assertEqual(1, code)
+        self.assertIn('FileNotFoundError', error)
+
+        code, _, error = self._run('--test', self.test_file, '--connect', self.socket_path + '.nothing')
+        self.assertEqual(1, code)
+        self.assertIn('No process is serving', error)
+
+
+class MemoryPlanCacheTest(unittest.TestCase):
+
+    def test_keep_in_memory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PlanCache()
+            cache.keep_in_memory(entries=1)
+            paths = []
+            for name in ('a', 'b'):
+                paths.append(os.path.join(directory, name + '.yaml'))
+                with open(paths[-1], 'w') as f:
+                    f.write('- url: /%s\n' % name)
+            plan = cache.load(paths[0])
+            plan[0]['url'] = '/changed'  # Callers get a copy of their own
+            self.assertEqual([{'url': '/a'}], cache.load(paths[0]))
+            self.assertEqual((1, 1), (cache.hits, cache.misses))
+            cache.load(paths[1])
+            cache.load(paths[0])
+            self.assertEqual((1, 3), (cache.hits, cache.misses))  # Only the last entry is kept
+
+
+if __name__ == '__main__':
+    unittest.main()
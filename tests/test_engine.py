@@ -0,0 +1,108 @@
+import time
+import unittest
+from unittest import mock
+
+from local_server import LocalServer
+from py3resttest.engine import CurlMultiEngine
+from py3resttest.generators import factory_generate_ids
+from py3resttest.pool import CurlPool
+from py3resttest.testcase import TestCase, TestCaseGroup, TestCaseConfig
+
+
+class CurlMultiEngineTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = LocalServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__()
+
+    def _group(self, name, testcase_list):
+        group = TestCaseGroup(name, config=TestCaseConfig())
+        for testcase_dict in testcase_list:
+            testcase = TestCase(self.server.url, None, None, context=group.context)
+            testcase.parse(testcase_dict)
+            group.testcase_list = testcase
+        return group
+
+    def test_invalid_concurrency(self):
+        self.assertRaises(ValueError, CurlMultiEngine, 0)
+
+    def test_groups_run_concurrently(self):
+        group_dict = {
+            "group%s" % i: self._group("group%s" % i, [{'name': 'slow', 'url': '/slow?sleep=0.3'}])
+            for i in range(4)
+        }
+        finished = []
+        start = time.monotonic()
+        CurlMultiEngine(concurrency=4).run(group_dict, callback=lambda g, t: finished.append((g, t)))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(4, len(finished))
+        self.assertTrue(all(testcase.is_passed for _, testcase in finished))
+        self.assertLess(elapsed, 1.0)
+
+    def test_group_order_preserved(self):
+        group = self._group("chain", [
+            {'name': 'first', 'url': '/first?sleep=0.2',
+             'extract_binds': [{'next_path': {'jsonpath_mini': 'path'}}]},
+            {'name': 'second', 'url': {'template': '$next_path/second'}},
+            {'name': 'third', 'url': '/third'},
+        ])
+        other = self._group("other", [{'name': 'other', 'url': '/other'}])
+        finished = []
+        CurlMultiEngine(concurrency=4, ordered=True).run({'chain': group, 'other': other},
+                                                         callback=lambda g, t: finished.append(t.name))
+
+        chain = [name for name in finished if name != 'other']
+        self.assertEqual(['first', 'second', 'third'], chain)
+        self.assertTrue(group.testcase_list[1].is_passed)
+        self.assertEqual(self.server.url + '/first/second', group.testcase_list[1].url)
+
+    def test_group_dependencies(self):
+        group = self._group("chain", [
+            {'name': 'first', 'url': '/first?sleep=0.3',
+             'extract_binds': [{'next_path': {'jsonpath_mini': 'path'}}]},
+            {'name': 'second', 'url': {'template': '$next_path/second'}},
+            {'name': 'independent', 'url': '/independent'},
+        ])
+        finished = []
+        CurlMultiEngine(concurrency=4).run({'chain': group}, callback=lambda g, t: finished.append(t.name))
+
+        self.assertEqual(['independent', 'first', 'second'], finished)
+        self.assertTrue(all(testcase.is_passed for testcase in group.testcase_list))
+        self.assertEqual(self.server.url + '/first/second', group.testcase_list[1].url)
+
+    def test_delay_holds_slot(self):
+        delayed = self._group("delayed", [{'name': 'delayed', 'url': '/delayed', 'delay': 1}])
+        other = self._group("other", [{'name': 'other', 'url': '/other'}])
+        finished = []
+        CurlMultiEngine(concurrency=1).run({'delayed': delayed, 'other': other},
+                                           callback=lambda g, t: finished.append(t.name))
+        self.assertEqual(['delayed', 'other'], finished)
+
+    def test_pooled_by_final_url(self):
+        group = self._group("generated", [{'name': 'generated', 'url': {'template': '/p/$id'},
+                                           'generator_binds': {'id': 'ids'}}])
+        group.context.add_generator('ids', factory_generate_ids(10)())
+        pool = CurlPool()
+        with mock.patch.object(pool, 'acquire', wraps=pool.acquire) as acquire:
+            CurlMultiEngine(pool=pool).run({'generated': group})
+        pool.close()
+        acquire.assert_called_once_with(self.server.url + '/p/10')
+        self.assertTrue(group.testcase_list[0].is_passed)
+
+    def test_curl_error_is_failure(self):
+        group = TestCaseGroup("broken", config=TestCaseConfig())
+        testcase = TestCase('http://127.0.0.1:1', None, None, context=group.context)
+        testcase.parse({'name': 'refused', 'url': '/nothing'})
+        group.testcase_list = testcase
+        CurlMultiEngine().run({'broken': group})
+
+        self.assertFalse(testcase.is_passed)
+        self.assertEqual(1, len(testcase.failures))
+        self.assertIn('Curl Exception', testcase.failures[0].message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,11 @@
 import unittest
+from unittest import mock
 
-from py3resttest.ext.extractor_jmespath import JMESPathExtractor
+import jmespath
+
+from py3resttest.binding import Context
+from py3resttest.ext.extractor_jmespath import JMESPathExtractor, compile_expression
+from py3resttest.response import ResponseBody
 
 
 class MTestJMESPathExtractor(unittest.TestCase):
@@ -17,6 +22,27 @@ class MTestJMESPathExtractor(unittest.TestCase):
         self.assertEqual(data, 23)
         self.assertRaises(ValueError, self.ext.extract_internal, 'test', None, 'abc')
 
+    def test_compiled_once(self):
+        body = ResponseBody('{"people": [{"name": "bob"}, {"name": "sue"}]}')
+        with mock.patch('jmespath.compile', wraps=jmespath.compile) as compile_mock:
+            compile_expression.cache_clear()
+            extractor = JMESPathExtractor.parse('people[1].name')
+            for _ in range(3):
+                self.assertEqual('sue', extractor.extract(body=body))
+
+            templated = JMESPathExtractor.parse({'template': 'people[$index].name'})
+            self.assertIsNone(templated.compiled_expression)
+            context = Context()
+            context.bind_variable('index', 0)
+            for _ in range(3):
+                self.assertEqual('bob', templated.extract(body=body, context=context))
+            self.assertEqual(2, compile_mock.call_count)
+
+    def test_invalid_query(self):
+        extractor = JMESPathExtractor.parse('people[')
+        self.assertIsNone(extractor.compiled_expression)
+        self.assertRaises(ValueError, extractor.extract, body='{}')
+
 
 if __name__ == '__main__':
     unittest.main()
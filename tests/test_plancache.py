@@ -0,0 +1,79 @@
+import datetime
+import marshal
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from py3resttest import plancache
+from py3resttest.plancache import PlanCache
+
+
+class PlanCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.test_file = os.path.join(self.directory.name, 'test.yaml')
+        self.cache = PlanCache(os.path.join(self.directory.name, 'cache'))
+        self._write('- test:\n    - url: /a\n')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _write(self, text):
+        with open(self.test_file, 'w') as f:
+            f.write(text)
+
+    def test_cached_by_content(self):
+        self.assertEqual([{'test': [{'url': '/a'}]}], self.cache.load(self.test_file))
+        with mock.patch('py3resttest.plancache.parse_yaml') as parse_yaml:
+            self.assertEqual([{'test': [{'url': '/a'}]}], self.cache.load(self.test_file))
+            parse_yaml.assert_not_called()
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+        self._write('- test:\n    - url: /b\n')
+        self.assertEqual([{'test': [{'url': '/b'}]}], self.cache.load(self.test_file))
+        self.assertEqual(2, self.cache.misses)
+
+    def test_corrupt_entry(self):
+        self.cache.load(self.test_file)
+        with open(self.test_file, 'rb') as f:
+            key = PlanCache.key(f.read())
+        entry_path = os.path.join(self.cache.directory, key[:2], key + '.marshal')
+        with open(entry_path, 'wb') as f:
+            f.write(b'not marshalled')
+        self.assertEqual([{'test': [{'url': '/a'}]}], self.cache.load(self.test_file))
+        self.assertEqual(2, self.cache.misses)
+        self.assertEqual([{'test': [{'url': '/a'}]}], self.cache.load(self.test_file))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_private_plain_entries(self):
+        self.cache.load(self.test_file)
+        self.assertEqual(0o700, os.stat(self.cache.directory).st_mode & 0o777)
+        with open(self.test_file, 'rb') as f:
+            key = PlanCache.key(f.read())
+        entry_path = os.path.join(self.cache.directory, key[:2], key + '.marshal')
+        self.assertEqual(0o700, os.stat(os.path.dirname(entry_path)).st_mode & 0o777)
+        with open(entry_path, 'rb') as f:
+            self.assertEqual([{'test': [{'url': '/a'}]}], marshal.load(f))
+
+    def test_unmarshallable_not_cached(self):
+        self._write('- test:\n    - url: /a\n    - name: 2024-01-02\n')
+        plan = self.cache.load(self.test_file)
+        self.assertEqual(datetime.date(2024, 1, 2), plan[0]['test'][1]['name'])
+        self.assertEqual(plan, self.cache.load(self.test_file))
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+
+    def test_disabled(self):
+        cache = PlanCache(None)
+        self.assertFalse(cache.enabled)
+        self.assertEqual([{'test': [{'url': '/a'}]}], cache.load(self.test_file))
+        self.assertEqual((0, 0), (cache.hits, cache.misses))
+        with mock.patch.dict(os.environ, {plancache.CACHE_DIR_VARIABLE: ''}):
+            self.assertIsNone(plancache.default_cache_directory())
+        with mock.patch.dict(os.environ, {plancache.CACHE_DIR_VARIABLE: '/tmp/plans'}):
+            self.assertEqual('/tmp/plans', plancache.default_cache_directory())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from local_server import LocalServer
+from py3resttest.pool import CurlPool, ConnectionStats
+from py3resttest.testcase import TestCase, TestCaseConfig
+
+
+class CurlPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = LocalServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__()
+
+    def test_host_key(self):
+        self.assertEqual(('http', 'example.com:80'), CurlPool.host_key('HTTP://Example.com:80/api?x=1'))
+
+    def test_stats(self):
+        stats = ConnectionStats()
+        stats.record(1)
+        stats.record(0)
+        stats.record(0)
+        self.assertEqual(3, stats.requests)
+        self.assertEqual(1, stats.new_connections)
+        self.assertEqual(2, stats.reused_connections)
+
+    def test_connection_reused(self):
+        pool = CurlPool()
+        for index in range(3):
+            testcase = TestCase(self.server.url, None, None)
+            testcase.parse({'url': '/item/%s' % index})
+            curl_handler = pool.acquire(testcase.url)
+            testcase.run(curl_handler=curl_handler)
+            pool.release(curl_handler)
+            self.assertTrue(testcase.is_passed)
+        self.assertEqual(3, pool.stats.requests)
+        self.assertEqual(1, pool.stats.new_connections)
+        self.assertEqual(2, pool.stats.reused_connections)
+        pool.close()
+
+    def test_keep_alive_disabled(self):
+        config = TestCaseConfig()
+        config.parse({'keep_alive': False})
+        pool = CurlPool()
+        for index in range(2):
+            testcase = TestCase(self.server.url, None, None, config=config)
+            testcase.parse({'url': '/item'})
+            curl_handler = pool.acquire(testcase.url)
+            testcase.run(curl_handler=curl_handler)
+            pool.release(curl_handler)
+        self.assertEqual(2, pool.stats.new_connections)
+        self.assertEqual(0, pool.stats.reused_connections)
+        pool.close()
+
+    def test_max_idle(self):
+        pool = CurlPool(max_idle_per_host=1)
+        handlers = [pool.acquire(self.server.url) for _ in range(2)]
+        self.assertIsNot(handlers[0], handlers[1])
+        for curl_handler in handlers:
+            testcase = TestCase(self.server.url, None, None)
+            testcase.parse({'url': '/'})
+            testcase.run(curl_handler=curl_handler)
+            pool.release(curl_handler)
+        self.assertIs(handlers[0], pool.acquire(self.server.url))
+        pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
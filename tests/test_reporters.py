@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+from io import StringIO
+
+from local_server import LocalServer
+from py3resttest.reporters import ConsoleReporter, JsonLinesReporter, JUnitReporter, ResultSummary, TestOutcome
+from py3resttest.response import Timings
+from py3resttest.testcase import TestCase
+
+
+class ReportersTest(unittest.TestCase):
+
+    def test_summary(self):
+        summary = ResultSummary(4)
+        summary.record('a', TestOutcome('a1', True, []))
+        summary.record('a', TestOutcome('a2', False, ['bad']))
+        summary.record('b', TestOutcome('b1', True, []))
+        self.assertEqual(2, summary.passed)
+        self.assertEqual(1, summary.failed)
+        self.assertEqual(3, summary.finished)
+        self.assertEqual({'a': [1, 1], 'b': [1, 0]}, summary.groups)
+
+    def test_console(self):
+        stream = StringIO()
+        reporter = ConsoleReporter(stream)
+        summary = ResultSummary(2)
+        for group_name, outcome in (('a', TestOutcome('a1', True, [])), ('a', TestOutcome('a2', False, ['bad']))):
+            summary.record(group_name, outcome)
+            reporter.report(group_name, outcome)
+        self.assertEqual(['a2'], [outcome.name for outcome in reporter.failure_dict['a']])
+        reporter.finish(summary)
+        output = stream.getvalue()
+        self.assertIn('Total Test to run: 2', output)
+        self.assertIn('Case Name: a2', output)
+        self.assertIn('bad', output)
+        self.assertIn('Total testcase success: 1', output)
+
+    def test_slowest(self):
+        stream = StringIO()
+        reporter = ConsoleReporter(stream, slowest=2)
+        for name, elapsed in (('a', 0.3), ('b', 0.1), ('c', 0.5), ('d', 0.2)):
+            reporter.report('g', TestOutcome(name, True, [], timings=Timings(total_time=elapsed, connect_time=0.01)))
+        reporter.report('g', TestOutcome('e', False, ['Curl Exception']))  # Never ran, no timings
+        self.assertEqual(['c', 'a'], [outcome.name for _, outcome in reporter.slowest_outcomes()])
+        reporter.finish(ResultSummary(5))
+        output = stream.getvalue()
+        self.assertIn('SLOWEST TESTS', output)
+        self.assertIn('1. c (group g): dns 0.000s, connect 0.010s', output)
+        self.assertNotIn('. b ', output)
+
+        stream = StringIO()
+        reporter = ConsoleReporter(stream, slowest=0)
+        reporter.report('g', TestOutcome('a', True, [], elapsed=0.1))
+        reporter.finish(ResultSummary(1))
+        self.assertNotIn('SLOWEST TESTS', stream.getvalue())
+
+    def test_jsonl(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.jsonl')
+            reporter = JsonLinesReporter(path)
+            reporter.report('a', TestOutcome('a1', True, [], status_code=200))
+            with open(path) as f:  # Written as soon as reported
+                self.assertEqual({'group': 'a', 'name': 'a1', 'passed': True, 'failures': [], 'status_code': 200,
+                                  'elapsed': None, 'timings': None}, json.loads(f.readline()))
+            reporter.report('b', TestOutcome('b1', False, ['Curl Exception']))
+            reporter.close()
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual(2, len(lines))
+        self.assertIsNone(lines[1]['status_code'])
+
+    def test_junit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'junit.xml')
+            reporter = JUnitReporter(path)
+            reporter.start(ResultSummary(3))
+            reporter.report('a', TestOutcome('a1', True, [], status_code=200, elapsed=0.25))
+            reporter.report('b', TestOutcome('b<1>', False, ['Invalid & wrong', 'second'], status_code=500,
+                                             elapsed=0.5))
+            with open(path) as f:  # Test cases are written as they are reported
+                self.assertIn('name="b&lt;1&gt;"', f.read())
+            reporter.report('a', TestOutcome('a2', False, ['Curl Exception: timeout']))
+            reporter.close()
+            reporter.close()
+            root = ElementTree.parse(path).getroot()
+
+        suite = root.find('testsuite')
+        self.assertEqual(('3', '1', '1'), (suite.get('tests'), suite.get('failures'), suite.get('errors')))
+        self.assertAlmostEqual(0.75, float(suite.get('time')))
+        cases = suite.findall('testcase')
+        self.assertEqual(['a', 'b', 'a'], [case.get('classname') for case in cases])
+        self.assertEqual('0.250000', cases[0].get('time'))
+        self.assertIsNone(cases[0].find('failure'))
+        self.assertEqual('Invalid & wrong', cases[1].find('failure').get('message'))
+        self.assertEqual('Invalid & wrong\nsecond', cases[1].find('failure').text)
+        self.assertIsNotNone(cases[2].find('error'))
+
+    def test_junit_counters_wider_than_placeholder(self):
+        class NarrowJUnitReporter(JUnitReporter):
+            COUNTER_WIDTH = 5
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'junit.xml')
+            reporter = NarrowJUnitReporter(path)
+            reporter.start(ResultSummary(2))
+            reporter.report('a', TestOutcome('a1', True, [], status_code=200, elapsed=1234.5))
+            reporter.report('a', TestOutcome('a2', False, ['bad'], status_code=500, elapsed=0.5))
+            reporter.close()
+            self.assertGreater(len('tests="2" failures="1" errors="0" time="1235.000000"'), reporter.placeholder_width)
+            root = ElementTree.parse(path).getroot()
+
+        suite = root.find('testsuite')
+        self.assertEqual(('2', '1', '0'), (suite.get('tests'), suite.get('failures'), suite.get('errors')))
+        self.assertEqual(['a1', 'a2'], [case.get('name') for case in suite.findall('testcase')])
+        self.assertEqual('bad', suite.find('testcase/failure').get('message'))
+
+    def test_outcome_from_testcase(self):
+        with LocalServer() as server:
+            testcase = TestCase(server.url, None, None)
+            testcase.parse({'name': 'created', 'url': '/a?status=201', 'expected_status': [201]})
+            testcase.run()
+        outcome = TestOutcome.from_testcase(testcase)
+        self.assertTrue(outcome.is_passed)
+        self.assertEqual(201, outcome.status_code)
+        self.assertGreater(outcome.elapsed, 0)
+        self.assertEqual(outcome.elapsed, outcome.timings.total_time)
+        self.assertGreater(outcome.timings.size_download, 0)
+        self.assertLessEqual(outcome.timings.starttransfer_time, outcome.timings.total_time)
+        testcase.release_response()
+        self.assertIsNone(testcase.response)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import json
+import pickle
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from local_server import LocalServer
+from py3resttest.ext.extractor_jmespath import JMESPathExtractor
+from py3resttest.response import Response, ResponseBody, ResponseHeaders, Timings, parse_json_body
+from py3resttest.testcase import TestCase
+from py3resttest.validators import HeaderExtractor, MiniJsonExtractor
+
+
+class ResponseBodyTest(unittest.TestCase):
+
+    def test_bytes_and_str(self):
+        self.assertEqual('{"a": 1}', ResponseBody(b'{"a": 1}'))
+        self.assertEqual('{"a": 1}', ResponseBody('{"a": 1}'))
+        self.assertIsInstance(ResponseBody(b'{}'), str)
+
+    def test_parsed_once(self):
+        body = ResponseBody(b'{"person": {"name": "bob", "id": 5}}')
+        self.assertFalse(body.is_parsed)
+        with mock.patch('py3resttest.response.json.loads', wraps=json.loads) as loads:
+            self.assertEqual('bob', MiniJsonExtractor.parse('person.name').extract(body=body))
+            self.assertEqual(5, JMESPathExtractor.parse('person.id').extract(body=body))
+            self.assertIs(body.json(), parse_json_body(body))
+            self.assertEqual(1, loads.call_count)
+        self.assertTrue(body.is_parsed)
+        self.assertIsNone(body.json_error)
+
+    def test_decode_error(self):
+        body = ResponseBody(b'not json')
+        self.assertRaises(json.JSONDecodeError, body.json)
+        self.assertIsInstance(body.json_error, json.JSONDecodeError)
+        with mock.patch('py3resttest.response.json.loads') as loads:
+            self.assertRaises(json.JSONDecodeError, body.json)
+            loads.assert_not_called()
+        self.assertRaises(ValueError, MiniJsonExtractor.parse('a').extract, body=body)
+
+    def test_plain_bodies(self):
+        self.assertEqual({'a': 1}, parse_json_body(b'{"a": 1}'))
+        self.assertEqual({'a': 1}, parse_json_body('{"a": 1}'))
+
+
+class ResponseTest(unittest.TestCase):
+
+    def test_raw_view(self):
+        buffer = BytesIO()
+        buffer.write(b'{"a": [1, 2]}')
+        response = Response(200, [('content-type', 'application/json')], buffer)
+        self.assertIsInstance(response.raw, memoryview)
+        self.assertEqual(b'{"a": [1, 2]}', response.raw)
+        self.assertEqual(13, len(response))
+        self.assertRaises(BufferError, buffer.write, b'more')  # No copy: the view pins the buffer curl wrote to
+
+    def test_lazy_text_and_json(self):
+        response = Response(200, content=b'{"a": [1, 2]}')
+        with mock.patch('py3resttest.response.json.loads', wraps=json.loads) as loads:
+            self.assertIs(response.text, response.text)
+            loads.assert_not_called()
+            self.assertEqual({'a': [1, 2]}, response.json())
+            self.assertIs(response.json(), response.text.json())
+            self.assertEqual(1, loads.call_count)
+        self.assertEqual(0, len(Response(204).headers))
+
+    def test_close(self):
+        response = Response(200, content=b'abc')
+        text = response.text
+        response.close()
+        self.assertEqual('abc', text)
+        self.assertRaises(ValueError, lambda: response.raw[0])
+
+
+class ResponseHeadersTest(unittest.TestCase):
+
+    def test_lookup(self):
+        headers = ResponseHeaders()
+        for line in (b'HTTP/1.1 200 OK\r\n', b'Content-Type: application/json\r\n', b'Set-Cookie: a=1\r\n',
+                     b'set-cookie: b=2\r\n', b'X-Long: first\r\n', b'  second\r\n', b'\r\n'):
+            headers.feed(line)
+        self.assertEqual('HTTP/1.1 200 OK', headers.status_line)
+        self.assertEqual('application/json', headers['CONTENT-TYPE'])
+        self.assertEqual(['a=1', 'b=2'], headers.get_all('Set-Cookie'))
+        self.assertEqual('first second', headers.get('x-long'))
+        self.assertIn('content-type', headers)
+        self.assertIsNone(headers.get('missing'))
+        self.assertEqual([], headers.get_all('missing'))
+        self.assertRaises(KeyError, lambda: headers['missing'])
+        self.assertEqual(4, len(headers))
+        self.assertEqual(('content-type', 'application/json'), list(headers)[0])
+
+    def test_last_block_kept(self):
+        headers = ResponseHeaders.parse(
+            b'HTTP/1.1 100 Continue\r\n\r\n'
+            b'HTTP/1.1 302 Found\r\nLocation: /next\r\nX-Hop: 1\r\n\r\n'
+            b'HTTP/1.1 200 OK\r\nX-Hop: 2\r\n\r\n'
+        )
+        self.assertEqual('HTTP/1.1 200 OK', headers.status_line)
+        self.assertEqual([('x-hop', '2')], headers.items())
+        self.assertNotIn('location', headers)
+
+    def test_trailers_kept(self):
+        headers = ResponseHeaders.parse(
+            b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nTrailer: X-Checksum\r\n\r\n'
+            b'X-Checksum: abc\r\n\r\n'
+        )
+        self.assertEqual('HTTP/1.1 200 OK', headers.status_line)
+        self.assertEqual('chunked', headers['transfer-encoding'])
+        self.assertEqual('abc', headers['x-checksum'])
+
+    def test_header_extractor(self):
+        headers = ResponseHeaders.parse('HTTP/1.1 200 OK\r\nX-Id: 1\r\nX-Id: 2\r\nX-Name: bob\r\n\r\n')
+        self.assertEqual('bob', HeaderExtractor.parse('x-name').extract(headers=headers))
+        self.assertEqual(['1', '2'], HeaderExtractor.parse('X-ID').extract(headers=headers))
+        self.assertRaises(ValueError, HeaderExtractor.parse('missing').extract, headers=headers)
+
+
+class ChunkedTrailersTest(unittest.TestCase):
+
+    def test_trailers(self):
+        with LocalServer() as server:
+            testcase = TestCase(server.url, None, None)
+            testcase.parse({'url': '/chunked?trailer=abc'})
+            testcase.run()
+        self.assertTrue(testcase.is_passed)
+        headers = testcase.response.headers
+        self.assertEqual('HTTP/1.1 200 OK', headers.status_line)
+        self.assertEqual('/chunked', headers['x-path'])
+        self.assertEqual('abc', headers['x-checksum'])
+        self.assertEqual('/chunked', testcase.response.json()['path'])
+
+
+class TimingsTest(unittest.TestCase):
+
+    def test_record(self):
+        timings = Timings(total_time=0.5, size_download=10)
+        self.assertEqual(0.5, timings.get('total_time'))
+        self.assertEqual(0.0, timings.connect_time)
+        self.assertRaises(ValueError, timings.get, 'nope')
+        self.assertEqual(set(Timings.METRICS), set(timings.to_dict()))
+        self.assertFalse(hasattr(timings, '__dict__'))
+        self.assertEqual(timings.to_dict(), pickle.loads(pickle.dumps(timings)).to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
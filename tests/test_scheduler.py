@@ -0,0 +1,79 @@
+import unittest
+
+from py3resttest.scheduler import DependencyGraph, build_dependencies
+from py3resttest.testcase import TestCase
+
+
+class DependencyGraphTest(unittest.TestCase):
+
+    @staticmethod
+    def _testcases(testcase_list, variable_binds=None):
+        output = []
+        for testcase_dict in testcase_list:
+            testcase = TestCase('http://localhost', None, variable_binds)
+            testcase.parse(testcase_dict)
+            output.append(testcase)
+        return output
+
+    def test_independent(self):
+        testcase_list = self._testcases([{'url': '/a'}, {'url': '/b'}, {'url': '/c'}])
+        self.assertEqual([set(), set(), set()], build_dependencies(testcase_list))
+
+    def test_extract_dependency(self):
+        testcase_list = self._testcases([
+            {'url': '/login', 'extract_binds': [{'token': {'jsonpath_mini': 'token'}}]},
+            {'url': '/other'},
+            {'url': '/items', 'headers': {'Authorization': {'template': 'Bearer $token'}}},
+            {'url': {'template': '/items/${token}'}},
+            {'url': '/check', 'validators': [{'compare': {'jsonpath_mini': 'id', 'expected': {'template': '$token'}}}]},
+        ])
+        self.assertEqual([set(), set(), {0}, {0}, {0}], build_dependencies(testcase_list))
+
+    def test_write_after_read(self):
+        testcase_list = self._testcases([
+            {'url': {'template': '/items/$id'}},
+            {'url': '/new', 'extract_binds': [{'id': {'jsonpath_mini': 'id'}}]},
+        ])
+        self.assertEqual([set(), {0}], build_dependencies(testcase_list))
+
+    def test_static_variable_binds(self):
+        shared_binds = {'user': 'bob'}
+        testcase_list = self._testcases([{'url': {'template': '/users/$user'}}, {'url': '/a'}],
+                                        variable_binds=shared_binds)
+        self.assertEqual([set(), set()], build_dependencies(testcase_list))
+
+        # Once a test binds another value, every test binding user must keep its place
+        testcase_list.extend(self._testcases([{'url': '/b', 'variable_binds': {'user': 'alice'}}]))
+        self.assertEqual([set(), {0}, {0, 1}], build_dependencies(testcase_list))
+
+    def test_delay(self):
+        testcase_list = self._testcases([{'url': '/a'}, {'url': '/b'}, {'url': '/c', 'delay': 1}])
+        self.assertEqual([set(), set(), {0, 1}], build_dependencies(testcase_list))
+
+    def test_ready(self):
+        testcase_list = self._testcases([
+            {'url': '/login', 'extract_binds': [{'token': {'jsonpath_mini': 'token'}}]},
+            {'url': {'template': '/items/$token'}},
+            {'url': '/other'},
+        ])
+        graph = DependencyGraph(testcase_list)
+        self.assertEqual([0, 2], graph.ready())
+        graph.start(0)
+        graph.start(2)
+        self.assertEqual([], graph.ready())
+        graph.finish(2)
+        graph.finish(0)
+        self.assertEqual([1], graph.ready())
+        graph.start(1)
+        self.assertFalse(graph.is_finished)
+        graph.finish(1)
+        self.assertTrue(graph.is_finished)
+
+    def test_ordered(self):
+        graph = DependencyGraph(self._testcases([{'url': '/a'}, {'url': '/b'}]), ordered=True)
+        self.assertEqual([set(), {0}], graph.dependencies)
+        self.assertEqual([0], graph.ready())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import pickle
+import unittest
+
+from py3resttest.selection import TestSelector, parse_tags
+from py3resttest.testcase import TestSet
+
+
+class TestSelectorTest(unittest.TestCase):
+
+    def test_glob_and_regex(self):
+        selector = TestSelector(names=['login*', 're:^user_\\d+$'])
+        self.assertTrue(selector.matches('login_ok', 'g'))
+        self.assertFalse(selector.matches('bad_login', 'g'))
+        self.assertTrue(selector.matches('user_12', 'g'))
+        self.assertFalse(selector.matches('user_x', 'g'))
+        self.assertTrue(TestSelector().matches('anything', 'g'))
+        self.assertFalse(TestSelector().is_selective)
+        self.assertRaises(ValueError, TestSelector, names=['re:('])
+
+    def test_kinds_combined(self):
+        selector = TestSelector(groups=['auth'], tags=['smoke', 'fast'])
+        self.assertTrue(selector.matches('a', 'auth', ['slow', 'smoke']))
+        self.assertFalse(selector.matches('a', 'auth', ['slow']))
+        self.assertFalse(selector.matches('a', 'auth'))
+        self.assertFalse(selector.matches('a', 'users', ['smoke']))
+
+    def test_pickle(self):
+        selector = pickle.loads(pickle.dumps(TestSelector(names=['a*'], tags=['smoke'])))
+        self.assertEqual(['a*'], selector.names)
+        self.assertTrue(selector.matches('ab', 'g', ['smoke']))
+        self.assertFalse(selector.matches('ba', 'g', ['smoke']))
+
+    def test_parse_tags(self):
+        self.assertEqual(['smoke', 'fast'], parse_tags('smoke, fast'))
+        self.assertEqual(['smoke', '1'], parse_tags(['smoke', 1]))
+        self.assertEqual([], parse_tags(None))
+
+
+class SelectedParsingTest(unittest.TestCase):
+
+    def test_only_selected_built(self):
+        testcase_list = [
+            {'test': [{'name': 'login'}, {'url': '/login'}, {'group': 'auth'}, {'tags': ['smoke']}]},
+            {'test': [{'name': 'logout'}, {'url': '/logout'}, {'group': 'auth'}]},
+            {'test': [{'name': 'list'}, {'url': '/users'}, {'group': 'users'}, {'tags': 'smoke, slow'}]},
+            {'benchmark': [{'name': 'bench'}, {'url': '/users'}, {'group': 'users'}]},
+            {'url': '/plain'},
+        ]
+        testset = TestSet()
+        testset.parse('http://localhost', testcase_list, selector=TestSelector(tags=['smoke']))
+        groups = testset.test_group_list_dict
+        self.assertEqual({'auth', 'users'}, set(groups))
+        self.assertEqual(['login'], [testcase.name for testcase in groups['auth'].testcase_list])
+        self.assertEqual(['smoke', 'slow'], groups['users'].testcase_list[0].tags)
+        self.assertEqual([], groups['users'].benchmark_list)
+
+        testset = TestSet()
+        testset.parse('http://localhost', testcase_list, selector=TestSelector(groups=['us*']))
+        groups = testset.test_group_list_dict
+        self.assertEqual({'users'}, set(groups))
+        self.assertEqual(['bench'], [benchmark.name for benchmark in groups['users'].benchmark_list])
+
+
+if __name__ == '__main__':
+    unittest.main()
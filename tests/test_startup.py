@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from local_server import LocalServer
+
+# Modules only a run needs, importing them when the command line starts costs more than a small suite takes
+HEAVY_MODULES = ('pycurl', 'yaml', 'jsonschema', 'jmespath', 'alive_progress', 'xml.sax.saxutils',
+                 'py3resttest.testcase', 'py3resttest.validators', 'py3resttest.engine', 'py3resttest.workers')
+
+# What a client handing its run to a serving process needs neither, it only reads JSON lines
+CLIENT_EXCLUDED_MODULES = ('pycurl', 'yaml', 'jsonschema', 'jmespath')
+
+# Wall clock budgets, on top of starting a bare interpreter, only checked when asked for:
+# shared CI machines are too noisy for them to gate every run
+TIMING_VARIABLE = 'PY3RESTTEST_TIMING_TESTS'
+HELP_BUDGET = 0.100
+SMOKE_BUDGET = 0.250
+
+CLIENT_SCRIPT = """
+import json, sys
+from py3resttest.runner import Runner
+sys.argv = ['py3resttest'] + sys.argv[1:]
+code = Runner().main()
+print(json.dumps({'code': code, 'modules': sorted(sys.modules)}))
+"""
+
+
+def best_time(command, runs=5, env=None):
+    """ Quickest of a few runs of the command, the others are noise of the machine """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env, check=False)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def wait_for(path, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise AssertionError("Nothing appeared at %s" % path)
+        time.sleep(0.02)
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_imports_deferred(self):
+        output = subprocess.check_output([
+            sys.executable, '-c', 'import json, sys\nimport py3resttest.runner\nprint(json.dumps(sorted(sys.modules)))'
+        ])
+        loaded = set(json.loads(output.decode('utf-8')))
+        self.assertEqual([], [module for module in HEAVY_MODULES if module in loaded])
+
+    def test_connect_client(self):
+        with LocalServer() as server, tempfile.TemporaryDirectory() as directory:
+            test_file = os.path.join(directory, 'smoke.yaml')
+            with open(test_file, 'w') as f:
+                f.write('- test:\n    - url: /health\n')
+            socket_path = os.path.join(directory, 'py3resttest.sock')
+            env = dict(os.environ, PY3RESTTEST_CACHE_DIR=os.path.join(directory, 'cache'))
+            serving = subprocess.Popen([sys.executable, '-m', 'py3resttest.runner', '--serve', socket_path],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+            try:
+                wait_for(socket_path)
+                output = subprocess.check_output([sys.executable, '-c', CLIENT_SCRIPT, '--url', server.url,
+                                                  '--test', test_file, '--connect', socket_path], env=env)
+            finally:
+                serving.terminate()
+                serving.wait()
+        result = json.loads(output.decode('utf-8').splitlines()[-1])
+        self.assertEqual(0, result['code'])
+        self.assertIn('Total testcase success: 1', output.decode('utf-8'))
+        self.assertIn('py3resttest.daemon', result['modules'])
+        self.assertEqual([], [module for module in result['modules'] if module.split('.')[0] in CLIENT_EXCLUDED_MODULES])
+
+
+@unittest.skipUnless(os.environ.get(TIMING_VARIABLE), "set %s=1 to check the startup time budgets" % TIMING_VARIABLE)
+class StartupTimeTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.interpreter = best_time([sys.executable, '-c', 'pass'])
+
+    def test_help(self):
+        elapsed = best_time([sys.executable, '-m', 'py3resttest.runner', '--help']) - self.interpreter
+        self.assertLess(elapsed, HELP_BUDGET, "--help took %.3fs on top of the interpreter" % elapsed)
+
+    def test_smoke_suite(self):
+        with LocalServer() as server, tempfile.TemporaryDirectory() as directory:
+            test_file = os.path.join(directory, 'smoke.yaml')
+            with open(test_file, 'w') as f:
+                f.write('- test:\n    - url: /health\n')
+            env = dict(os.environ, PY3RESTTEST_CACHE_DIR=os.path.join(directory, 'cache'))
+            elapsed = best_time([sys.executable, '-m', 'py3resttest.runner', '--url', server.url, '--test', test_file],
+                                env=env) - self.interpreter
+        self.assertLess(elapsed, SMOKE_BUDGET, "A one test suite took %.3fs on top of the interpreter" % elapsed)
+
+
+if __name__ == '__main__':
+    unittest.main()
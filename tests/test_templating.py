@@ -0,0 +1,50 @@
+import string
+import unittest
+from unittest import mock
+
+from py3resttest.binding import Context
+from py3resttest.templating import CompiledTemplate, compile_template
+
+
+class CompiledTemplateTest(unittest.TestCase):
+
+    def test_matches_string_template(self):
+        values = {'name': 'bob', 'id': 5, 'empty': ''}
+        for template in ['plain', '$name', '${name}s', '/users/$id/$name', '$$name costs $$5', '$missing and $name',
+                         '${missing}', 'trailing $', '$1 invalid', '$name$id$empty', '', '$name.$name']:
+            self.assertEqual(string.Template(template).safe_substitute(values),
+                             CompiledTemplate(template).render(values), template)
+
+    def test_variables(self):
+        self.assertEqual(('name', 'id'), CompiledTemplate('$name/${id}/$name/$$escaped').variables)
+        self.assertTrue(CompiledTemplate('no $$variables').is_static)
+
+    def test_render_cached(self):
+        context = Context()
+        context.bind_variable('id', 1)
+        context.bind_variable('other', 'x')
+        template = CompiledTemplate('/item/$id')
+
+        with mock.patch.object(template, 'substitute', wraps=template.substitute) as substitute:
+            self.assertEqual('/item/1', template.render(context))
+            self.assertEqual('/item/1', template.render(context))
+            context.bind_variable('other', 'y')  # Not referenced by the template
+            context.bind_variable('id', 1)  # Same value, no change
+            self.assertEqual('/item/1', template.render(context))
+            self.assertEqual(1, substitute.call_count)
+
+            context.bind_variable('id', 2)
+            self.assertEqual('/item/2', template.render(context))
+            self.assertEqual(2, substitute.call_count)
+
+            other_context = Context()
+            other_context.bind_variable('id', 3)
+            self.assertEqual('/item/3', template.render(other_context))
+            self.assertEqual(3, substitute.call_count)
+
+    def test_compile_shared(self):
+        self.assertIs(compile_template('$a/$b'), compile_template('$a/$b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,17 @@
+import json
+import os
+import tempfile
+import threading
 import unittest
+from unittest import mock
 from inspect import getframeinfo, currentframe
 from pathlib import Path
 
 import yaml
 
+from local_server import LocalServer
 from py3resttest.binding import Context
+from py3resttest.contenthandling import ContentHandler
 from py3resttest.testcase import TestCaseConfig, TestSet, TestCase
 from py3resttest.validators import MiniJsonExtractor
 
@@ -141,5 +148,153 @@ class TestTestCase(unittest.TestCase):
             self.assertEqual(1, len(ts.test_group_list_dict))
 
 
+class TestSetPlanTest(unittest.TestCase):
+
+    TESTCASE_LIST = [
+        {'test': [{'name': 'login'}, {'url': '/login'}, {'group': 'auth'}]},
+        {'test': [{'name': 'list'}, {'url': '/users'}, {'group': 'users'}]},
+    ]
+
+    def test_plans_independent(self):
+        first, second = TestSet(), TestSet()
+        first.parse('http://first', self.TESTCASE_LIST)
+        second.parse('http://second', self.TESTCASE_LIST[:1])
+        self.assertEqual({'auth', 'users'}, set(first.test_group_list_dict))
+        self.assertEqual({'auth'}, set(second.test_group_list_dict))
+        self.assertEqual('auth', first.test_group_list_dict['auth'].name)
+        self.assertEqual('http://first/login', first.test_group_list_dict['auth'].testcase_list[0].url)
+        self.assertEqual('http://second/login', second.test_group_list_dict['auth'].testcase_list[0].url)
+        self.assertIsNot(first.test_group_list_dict['auth'].context, second.test_group_list_dict['auth'].context)
+
+    def test_parse_concurrently(self):
+        testset_list = [TestSet() for _ in range(8)]
+        threads = [
+            threading.Thread(target=testset.parse, args=('http://host%d' % i, self.TESTCASE_LIST))
+            for i, testset in enumerate(testset_list)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i, testset in enumerate(testset_list):
+            urls = [testcase.url for group in testset.test_group_list_dict.values() for testcase in group.testcase_list]
+            self.assertEqual(['http://host%d/login' % i, 'http://host%d/users' % i], urls)
+
+    def test_merge(self):
+        first, second = TestSet(), TestSet()
+        first.parse('http://first', self.TESTCASE_LIST[:1])
+        second.parse('http://second', self.TESTCASE_LIST)
+        self.assertIs(first, first.merge(second))
+        self.assertIs(first, first.merge(first))
+        groups = first.test_group_list_dict
+        self.assertEqual(['http://first/login', 'http://second/login'], [t.url for t in groups['auth'].testcase_list])
+        self.assertIs(second.test_group_list_dict['users'], groups['users'])
+        self.assertEqual(1, len(second.test_group_list_dict['auth'].testcase_list))
+
+    def test_merge_included_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'common.yaml'), 'w') as f:
+                f.write("- test: [{name: common}, {url: /common}]\n")
+            first, second = TestSet(), TestSet()
+            second.parse('http://localhost', [{'include': ['common']}], working_directory=directory)
+            self.assertEqual({os.path.join(os.path.realpath(directory), 'common.yaml')}, second.testcase_files)
+            first.merge(second)
+            first.parse('http://localhost', [{'include': ['common']}], working_directory=directory)
+        self.assertEqual(1, len(first.test_group_list_dict['NO GROUP'].testcase_list))
+
+
+class IncludeTest(unittest.TestCase):
+
+    def test_content_relative_to_its_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'api', 'users'))
+            for path, text in (('api/users/list.yaml', "- test: [{name: users}, {url: /users}, {method: POST}, "
+                                                        "{body: {file: body.json}}]\n"),
+                               ('api/users/body.json', '{"user": 1}'),
+                               ('api/items.yaml', "- test: [{name: items}, {url: /items}, {method: POST}, "
+                                                  "{body: {file: body.json}}]\n"),
+                               ('api/body.json', '{"item": 1}')):
+                with open(os.path.join(directory, path), 'w') as f:
+                    f.write(text)
+            cwd = os.getcwd()
+            with mock.patch('os.chdir') as chdir:
+                ts = TestSet()
+                ts.parse('http://localhost', [{'include': ['api.users.list', 'api.items']}],
+                         working_directory=directory)
+                chdir.assert_not_called()
+            self.assertEqual(cwd, os.getcwd())
+        bodies = {testcase.name: testcase.body for testcase in ts.test_group_list_dict['NO GROUP'].testcase_list}
+        self.assertEqual({'users': '{"user": 1}', 'items': '{"item": 1}'}, bodies)
+
+
+class StreamedBodyTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = LocalServer().__enter__()
+        self.directory = tempfile.TemporaryDirectory()
+        self.body_file = os.path.join(self.directory.name, 'big.txt')
+        with open(self.body_file, 'w') as f:
+            f.write('x' * (ContentHandler.STREAM_THRESHOLD + 10))
+
+    def tearDown(self) -> None:
+        self.server.__exit__()
+        self.directory.cleanup()
+
+    def _run(self, method):
+        test_case = TestCase(self.server.url, None, None)
+        test_case.parse({'url': '/upload', 'method': method, 'body': {'file': self.body_file}})
+        self.assertTrue(test_case.is_streamed_body)
+        test_case.run()
+        self.assertTrue(test_case.is_passed, test_case.failures)
+        return test_case.response.json()
+
+    def test_streamed_methods(self):
+        for method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            echo = self._run(method)
+            self.assertEqual(method, echo['method'])
+            self.assertEqual(ContentHandler.STREAM_THRESHOLD + 10, len(echo['body']))
+
+    def test_streamed_head(self):
+        test_case = TestCase(self.server.url, None, None)
+        test_case.parse({'url': '/upload', 'method': 'HEAD', 'body': {'file': self.body_file}})
+        self.assertTrue(test_case.is_streamed_body)
+        with mock.patch.object(ContentHandler, 'open_stream') as open_stream:
+            test_case.run()
+            open_stream.assert_not_called()
+        self.assertTrue(test_case.is_passed, test_case.failures)
+        self.assertEqual(0, len(test_case.response))
+        self.assertEqual('/upload', test_case.response.headers['X-Path'])
+
+    def test_response_kept_apart(self):
+        test_case = TestCase(self.server.url, None, None)
+        test_case.parse({'url': '/echo', 'method': 'POST', 'body': 'request',
+                         'validators': [{'compare': {'header': 'x-path', 'expected': '/echo'}}]})
+        self.assertIsNone(test_case.response)
+        test_case.run()
+        self.assertTrue(test_case.is_passed, test_case.failures)
+        self.assertEqual('request', test_case.body)
+        self.assertEqual(200, test_case.response.status_code)
+        self.assertEqual('/echo', test_case.response.headers['X-Path'])
+        self.assertEqual('request', test_case.response.json()['body'])
+
+    def test_timing_validator(self):
+        test_case = TestCase(self.server.url, None, None)
+        test_case.parse({'url': '/slow?sleep=0.2', 'validators': [
+            {'timing': {'metric': 'total_time', 'comparator': 'gt', 'expected': 0.1}},
+            {'timing': {'metric': 'total_time', 'comparator': 'lt', 'expected': 0.1}}]})
+        test_case.run()
+        self.assertFalse(test_case.is_passed)
+        self.assertEqual(1, len(test_case.failures))
+        self.assertIn('lt(total_time=', str(test_case.failures[0]))
+
+    def test_small_file_read_once(self):
+        with open(self.body_file, 'w') as f:
+            f.write('small')
+        test_case = TestCase(self.server.url, None, None)
+        test_case.parse({'url': '/upload', 'method': 'POST', 'body': {'file': self.body_file}})
+        self.assertFalse(test_case.is_streamed_body)
+        self.assertEqual('small', test_case.body)
+
+
 if __name__ == '__main__':
     unittest.main()
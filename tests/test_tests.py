@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import os
 import string
 import unittest
 
@@ -332,6 +333,15 @@ class TestsTest(unittest.TestCase):
         self.assertEqual(string.Template(handler.content).safe_substitute(context.get_values()),
                          test.body)
 
+    def test_file_body(self):
+        file_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'person_body_notemplate.json')
+        with open(file_path, 'r') as f:
+            file_content = f.read()
+        test = TestCase('', None, None)
+        test.parse({'url': '/', 'method': 'POST', 'body': {'file': file_path}})
+        self.assertEqual(file_content, test.body)
+        self.assertIs(test.body, test.body)
+
     def test_header_templating(self):
         context = Context()
         test = TestCase('', None, None, context)
@@ -1,12 +1,14 @@
 import os
 import sys
+import tempfile
+import threading
 import unittest
 from inspect import currentframe, getframeinfo
 from pathlib import Path
 
 import pytest
 
-from py3resttest.utils import ChangeDir, read_testcase_file, Parser
+from py3resttest.utils import ChangeDir, read_testcase_file, read_testcase_files, resolve_path, ResolvePaths, Parser
 
 filename = getframeinfo(currentframe()).filename
 current_module_path = Path(filename)
@@ -25,6 +27,33 @@ class TestCaseUtils(unittest.TestCase):
             data = read_testcase_file(cd.new_path + '/sample.yaml')
             self.assertEqual(data['include'], 'example')
 
+    def test_resolve_paths(self):
+        cwd = os.getcwd()
+        self.assertEqual(os.path.join(cwd, 'a.json'), resolve_path('a.json'))
+        with ResolvePaths('/tmp'):
+            self.assertEqual(os.path.realpath('/tmp') + '/a.json', resolve_path('a.json'))
+            self.assertEqual('/etc/b.json', resolve_path('/etc/b.json'))
+            seen = []
+            thread = threading.Thread(target=lambda: seen.append(resolve_path('a.json')))
+            thread.start()
+            thread.join()
+            self.assertEqual([os.path.join(cwd, 'a.json')], seen)  # Other threads are unaffected
+            with ResolvePaths(None):
+                self.assertEqual(os.path.realpath('/tmp') + '/a.json', resolve_path('a.json'))
+        self.assertIsNone(ResolvePaths.current())
+        self.assertEqual(cwd, os.getcwd())
+
+    def test_read_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path_list = []
+            for index in range(5):
+                path_list.append(os.path.join(directory, '%s.yaml' % index))
+                with open(path_list[-1], 'w') as f:
+                    f.write('- test:\n    - url: /%s\n' % index)
+            content_list = read_testcase_files(path_list)
+        self.assertEqual(['/%s' % index for index in range(5)], [c[0]['test'][0]['url'] for c in content_list])
+        self.assertEqual([], read_testcase_files([]))
+
     def test_encode_unicode_bytes(self):
         decode_str = Parser.encode_unicode_bytes('my😽')
         self.assertEqual(decode_str, bytes('my😽', 'utf-8'))
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
+import os
+import tempfile
 import unittest
 from inspect import currentframe, getframeinfo
 from pathlib import Path
 
 from py3resttest import validators
 from py3resttest.binding import Context
-from py3resttest.constants import safe_length, regex_compare
-from py3resttest.ext.validator_jsonschema import JsonSchemaValidator
+from py3resttest.constants import safe_length, regex_compare, compile_regex
+from py3resttest.ext.validator_jsonschema import JsonSchemaValidator, compile_schema
+from py3resttest.response import Timings
 from py3resttest.validators import register_extractor, _get_extractor, register_test, register_comparator
 
 
@@ -123,6 +126,57 @@ class ValidatorsTest(unittest.TestCase):
     def test_regex_compare(self):
         txt = "Millie Finn Gaten"
         self.assertTrue(regex_compare(txt, "\s"))
+        self.assertTrue(regex_compare(txt, compile_regex("Finn")))
+        self.assertIs(compile_regex("Finn"), compile_regex("Finn"))
+        self.assertRaises(ValueError, regex_compare, txt, r"\s", max_length=5)
+
+    def test_timing_validator(self):
+        validator = validators.parse_validator('timing', {'metric': 'total_time', 'comparator': 'lt', 'expected': 0.2})
+        self.assertTrue(validator.uses_timings)
+        self.assertTrue(validator.validate(timings=Timings(total_time=0.1)))
+        failure = validator.validate(timings=Timings(total_time=0.35))
+        self.assertFalse(failure)
+        self.assertEqual(validators.FAILURE_VALIDATOR_FAILED, failure.failure_type)
+        self.assertIn('lt(total_time=0.35, 0.2)', failure.message)
+        self.assertEqual(validators.FAILURE_VALIDATOR_EXCEPTION, validator.validate().failure_type)
+
+        validator = validators.parse_validator('timing', {'expected': {'template': '$limit'}})
+        self.assertEqual(('total_time', 'lt'), (validator.metric, validator.comparator_name))
+        self.assertEqual({'limit'}, validator.template_variables())
+        context = Context()
+        context.bind_variable('limit', '0.5')
+        self.assertTrue(validator.validate(context=context, timings=Timings(total_time=0.4)))
+
+        self.assertRaises(ValueError, validators.parse_validator, 'timing', {'metric': 'nope', 'expected': 1})
+        self.assertRaises(ValueError, validators.parse_validator, 'timing', {'comparator': 'nope', 'expected': 1})
+        self.assertRaises(ValueError, validators.parse_validator, 'timing', {'expected': 'fast'})
+        self.assertRaises(ValueError, validators.parse_validator, 'timing', {'metric': 'total_time'})
+
+    def test_regex_validator(self):
+        validator = validators.ComparatorValidator.parse(
+            {'raw_body': '', 'comparator': 'regex', 'expected': 'id": \\d+'})
+        self.assertEqual('id": \\d+', validator.compiled_pattern.pattern)
+        self.assertTrue(validator.validate(body='{"id": 12}'))
+        self.assertFalse(validator.validate(body='{"id": "x"}'))
+
+        validator = validators.ComparatorValidator.parse(
+            {'raw_body': '', 'comparator': 'regex', 'expected': {'template': '$name'}, 'max_length': 10})
+        self.assertIsNone(validator.compiled_pattern)
+        context = Context()
+        context.bind_variable('name', 'bob')
+        self.assertTrue(validator.validate(body='hi bob', context=context))
+        failure = validator.validate(body='hi bob, and more', context=context)
+        self.assertFalse(failure)
+        self.assertEqual(validators.FAILURE_VALIDATOR_EXCEPTION, failure.failure_type)
+
+        self.assertRaises(ValueError, validators.ComparatorValidator.parse,
+                          {'raw_body': '', 'comparator': 'regex', 'expected': '(unclosed'})
+
+    def test_regex_validator_no_default_limit(self):
+        validator = validators.ComparatorValidator.parse(
+            {'raw_body': '', 'comparator': 'regex', 'expected': 'id": \\d+$'})
+        self.assertIsNone(validator.max_length)
+        self.assertTrue(validator.validate(body='x' * (5 * 1024 * 1024) + '{"id": 12'))
 
     def test_validatortest_exists(self):
         func = validators.VALIDATOR_TESTS['exists']
@@ -213,6 +267,22 @@ class ValidatorsTest(unittest.TestCase):
         val = validators.MiniJsonExtractor.query_dictionary(query, myobj)
         self.assertEqual(myobj, val)
 
+    def test_jsonpathmini_compiled(self):
+        extractor = validators.MiniJsonExtractor.parse('key.1.val')
+        self.assertEqual(('key', 1, 'val'), extractor.compiled_query.path)
+        self.assertIs(extractor.compiled_query, validators.compile_query('key.1.val'))
+        self.assertEqual(3, extractor.extract(body='{"key": [{}, {"val": 3}]}'))
+        self.assertIsNone(extractor.extract(body='{"key": {"1": {"val": 3}}}'))
+
+        templated = validators.MiniJsonExtractor.parse({'template': 'key.$index.val'})
+        self.assertIsNone(templated.compiled_query)
+        context = Context()
+        context.bind_variable('index', 1)
+        validators.compile_query.cache_clear()
+        for _ in range(3):
+            self.assertEqual(3, templated.extract(body='{"key": [{}, {"val": 3}]}', context=context))
+        self.assertEqual(1, validators.compile_query.cache_info().misses)
+
     def test_parse_extractor_minijson(self):
         config = 'key.val'
         extractor = validators.MiniJsonExtractor.parse(config)
@@ -669,5 +739,37 @@ class ValidatorsTest(unittest.TestCase):
         self.assertRaises(ValueError, JsonSchemaValidator.parse, {'x': 20})
         self.assertEqual(comp_validator.get_readable_config(), "JSON schema validation")
 
+    def test_jsonschema_compiled_once(self):
+        comp_validator = JsonSchemaValidator.parse({'schema': '{"type": "object", "required": ["id"]}'})
+        self.assertTrue(comp_validator.validate(body='{"id": 1}'))
+        self.assertFalse(comp_validator.validate(body='{"name": 1}'))
+        self.assertIs(comp_validator.compiled_schema(), comp_validator.compiled_schema())
+        self.assertIs(compile_schema('{"type": "object", "required": ["id"]}'), comp_validator.compiled_schema())
+
+    def test_jsonschema_file_mtime(self):
+        with tempfile.TemporaryDirectory() as directory:
+            schema_file = os.path.join(directory, 'schema.json')
+            with open(schema_file, 'w') as f:
+                f.write('{"type": "object", "required": ["id"]}')
+            comp_validator = JsonSchemaValidator.parse({'schema': {'file': schema_file}})
+            compiled = comp_validator.compiled_schema()
+            self.assertIs(compiled, comp_validator.compiled_schema())
+            self.assertFalse(comp_validator.validate(body='{"name": 1}'))
+
+            with open(schema_file, 'w') as f:
+                f.write('{"type": "object", "required": ["name"]}')
+            stat = os.stat(schema_file)
+            os.utime(schema_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self.assertIsNot(compiled, comp_validator.compiled_schema())
+            self.assertTrue(comp_validator.validate(body='{"name": 1}'))
+
+    def test_jsonschema_templated(self):
+        context = Context()
+        comp_validator = JsonSchemaValidator.parse({'schema': {'template': '{"required": ["$field"]}'}})
+        context.bind_variable('field', 'id')
+        self.assertTrue(comp_validator.validate(body='{"id": 1}', context=context))
+        context.bind_variable('field', 'name')
+        self.assertFalse(comp_validator.validate(body='{"id": 1}', context=context))
+
 if __name__ == '__main__':
     unittest.main()
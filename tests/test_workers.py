@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from local_server import LocalServer
+from py3resttest.testcase import TestCaseGroup, TestCaseConfig, TestCase
+from py3resttest.workers import WorkerPool, TestOutcome, shard_groups
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = LocalServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__()
+
+    @staticmethod
+    def _group(name, size):
+        group = TestCaseGroup(name, config=TestCaseConfig())
+        for _ in range(size):
+            group.testcase_list = TestCase('http://localhost', None, None)
+        return group
+
+    def test_invalid_workers(self):
+        self.assertRaises(ValueError, WorkerPool, 0)
+
+    def test_shard_groups(self):
+        group_dict = {'a': self._group('a', 4), 'b': self._group('b', 3), 'c': self._group('c', 1),
+                      'd': self._group('d', 0)}
+        self.assertEqual([['a'], ['b', 'c']], shard_groups(group_dict, 2))
+        self.assertEqual([['a'], ['b'], ['c']], shard_groups(group_dict, 4))
+
+    def test_outcome(self):
+        testcase = TestCase('http://localhost', None, None)
+        testcase.parse({'name': 'named'})
+        outcome = TestOutcome.from_testcase(testcase)
+        self.assertEqual('named', outcome.name)
+        self.assertFalse(outcome.is_passed)
+        self.assertEqual([], outcome.failures)
+
+    def test_run(self):
+        testcase_list = [
+            {'test': [{'name': 'a1'}, {'url': '/a1'}, {'group': 'a'}]},
+            {'test': [{'name': 'a2'}, {'url': '/a2?status=500'}, {'group': 'a'}]},
+            {'test': [{'name': 'b1'}, {'url': '/b1'}, {'group': 'b'}]},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            test_file = os.path.join(directory, 'test.yaml')
+            with open(test_file, 'w') as f:
+                yaml.safe_dump(testcase_list, f)
+            group_dict = {'a': self._group('a', 2), 'b': self._group('b', 1)}
+
+            finished = []
+            worker_pool = WorkerPool(2)
+            worker_pool.run(self.server.url, test_file, group_dict, callback=lambda g, o: finished.append((g, o)))
+
+        outcomes = {outcome.name: (group_name, outcome) for group_name, outcome in finished}
+        self.assertEqual({'a1', 'a2', 'b1'}, set(outcomes))
+        self.assertEqual('a', outcomes['a2'][0])
+        self.assertTrue(outcomes['a1'][1].is_passed)
+        self.assertFalse(outcomes['a2'][1].is_passed)
+        self.assertIn('Invalid HTTP response code', outcomes['a2'][1].failures[0])
+        self.assertEqual(3, worker_pool.stats.requests)
+
+
+if __name__ == '__main__':
+    unittest.main()